@@ -2,6 +2,7 @@
 
 import gc
 import logging
+import threading
 import time
 from typing import List, Union, Optional
 
@@ -52,6 +53,7 @@ class EmbeddingService:
         self.max_batch_size = max_batch_size
         self.memory_threshold_mb = memory_threshold_mb
         self.model = None
+        self._model_lock = threading.Lock()  # Serializes lazy loading across worker threads
         self.embedding_dimension: Optional[int] = None  # Auto-detected when model loads
         self.throttle_seconds = throttle_seconds
         self.use_mps = use_mps
@@ -68,12 +70,27 @@ class EmbeddingService:
             f"(cache={'enabled' if use_cache else 'disabled'}, throttle={throttle_seconds}s)"
         )
 
-    def load_model(self) -> None:
-        """Load the embedding model into memory."""
-        if self.model is not None:
+    def load_model(self) -> SentenceTransformer:
+        """Load the embedding model into memory.
+
+        Safe to call from several threads at once: only the first caller
+        loads the model, the others wait and reuse it.
+
+        Returns:
+            The loaded model, which stays usable even if unload_model() runs
+        """
+        model = self.model
+        if model is not None:
             logger.info("Model already loaded")
-            return
+            return model
+
+        with self._model_lock:
+            if self.model is not None:
+                return self.model
+            return self._load_model_locked()
 
+    def _load_model_locked(self) -> SentenceTransformer:
+        """Load the model and return it; caller must hold _model_lock."""
         logger.info(f"Loading model: {self.model_name}")
         try:
             # Detect best available device
@@ -109,6 +126,7 @@ class EmbeddingService:
                 f"Model loaded successfully on {self.device}. "
                 f"Embedding dimension: {self.embedding_dimension}"
             )
+            return self.model
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
@@ -156,9 +174,11 @@ class EmbeddingService:
         Returns:
             List of embedding vectors (dimension depends on model)
         """
-        # Ensure model is loaded
-        if self.model is None:
-            self.load_model()
+        # Ensure model is loaded; keep a local reference so a concurrent
+        # unload_model() cannot pull it out from under this call
+        model = self.model
+        if model is None:
+            model = self.load_model()
 
         # Normalize input to list
         if isinstance(texts, str):
@@ -208,7 +228,7 @@ class EmbeddingService:
             logger.debug(f"Processing batch {current_batch_num}/{total_batches} ({len(batch_texts)} texts)")
 
             # Generate embeddings for this batch
-            batch_embeddings = self.model.encode(
+            batch_embeddings = model.encode(
                 batch_texts,
                 convert_to_numpy=True,
                 show_progress_bar=False,
@@ -275,11 +295,13 @@ class EmbeddingService:
 
     def unload_model(self) -> None:
         """Unload the model from memory to free resources."""
-        if self.model is not None:
+        with self._model_lock:
+            if self.model is None:
+                return
             logger.info("Unloading model from memory")
             self.model = None
-            gc.collect()
-            logger.info("Model unloaded successfully")
+        gc.collect()
+        logger.info("Model unloaded successfully")
 
     def flush_cache(self) -> None:
         """Flush embedding cache to disk."""
@@ -7,15 +7,46 @@ This module generates fork commands in two modes:
 """
 
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import os
+import stat
 
 from .session_registry import SessionMetadata
 
 logger = logging.getLogger(__name__)
 
+# Default sessions directory, expanded once per process
+_DEFAULT_SESSIONS_DIR = os.path.expanduser("~/.claude")
+
+# Maximum number of formatted metadata strings kept per generator
+_METADATA_CACHE_SIZE = 256
+
+# Maximum number of found session paths kept per generator
+_PATH_CACHE_SIZE = 256
+
+# Section rules used in fork output
+_HEAVY_RULE = "=" * 80
+_LIGHT_RULE = "-" * 80
+
+
+def _try_stat(path: str) -> Optional[os.stat_result]:
+    """Stat a path, returning None if it does not exist or cannot be read."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration as "Ns" under a minute, otherwise "Mm Ss"."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes}m {secs}s"
+
 
 @dataclass
 class ForkCommand:
@@ -36,14 +67,32 @@ class ForkGenerator:
     - In-session fork: /fork [id] [path]
     """
 
-    def __init__(self, claude_sessions_dir: str = "~/.claude"):
+    def __init__(self, claude_sessions_dir: Optional[str] = None):
         """
         Initialize the ForkGenerator.
 
         Args:
             claude_sessions_dir: Directory where Claude session files are stored
+                (default: ~/.claude)
         """
-        self.claude_sessions_dir = os.path.expanduser(claude_sessions_dir)
+        if claude_sessions_dir is None:
+            self.claude_sessions_dir = _DEFAULT_SESSIONS_DIR
+        else:
+            self.claude_sessions_dir = os.path.expanduser(claude_sessions_dir)
+
+        # Directory prefixes joined once, so lookups only append the file name.
+        # os.path.join handles a root, empty or trailing-separator directory.
+        self._dir_prefix = os.path.join(self.claude_sessions_dir, "")
+        self._projects_prefix = os.path.join(self.claude_sessions_dir, "projects", "")
+        self._sessions_prefix = os.path.join(self.claude_sessions_dir, "sessions", "")
+
+        # Found session paths keyed by (session_id, project) (LRU); misses are
+        # not cached so a session created later is picked up on the next lookup
+        self._path_cache: OrderedDict[Tuple[str, Optional[str]], str] = OrderedDict()
+
+        # Formatted metadata strings keyed by the fields that are displayed (LRU)
+        self._metadata_cache: OrderedDict[Tuple[Any, ...], str] = OrderedDict()
+
         logger.info(f"Initialized ForkGenerator with sessions_dir: {self.claude_sessions_dir}")
 
     def find_session_path(self, session_id: str, project: Optional[str] = None) -> Optional[str]:
@@ -57,30 +106,44 @@ class ForkGenerator:
         Returns:
             Full path to session file, or None if not found
         """
+        cache_key = (session_id, project)
+        cached = self._path_cache.get(cache_key)
+        if cached is not None:
+            # One stat confirms the file has not been moved or archived since
+            cached_stat = _try_stat(cached)
+            if cached_stat is not None and stat.S_ISREG(cached_stat.st_mode):
+                self._path_cache.move_to_end(cache_key)
+                return cached
+            del self._path_cache[cache_key]
+
+        sep = os.sep
+        filename = f"{session_id}.jsonl"
+
         # Try common patterns
         patterns = []
 
         if project:
             # Try project-specific path
-            patterns.append(os.path.join(self.claude_sessions_dir, "projects", project, f"{session_id}.jsonl"))
+            patterns.append(f"{self._projects_prefix}{project}{sep}{filename}")
 
         # Try direct path
-        patterns.append(os.path.join(self.claude_sessions_dir, f"{session_id}.jsonl"))
+        patterns.append(f"{self._dir_prefix}{filename}")
 
         # Try sessions subdirectory
-        patterns.append(os.path.join(self.claude_sessions_dir, "sessions", f"{session_id}.jsonl"))
+        patterns.append(f"{self._sessions_prefix}{filename}")
 
         # Check each pattern
         for path in patterns:
-            if os.path.exists(path):
+            path_stat = _try_stat(path)
+            if path_stat is not None and stat.S_ISREG(path_stat.st_mode):
                 logger.info(f"Found session file at: {path}")
+                self._path_cache[cache_key] = path
+                if len(self._path_cache) > _PATH_CACHE_SIZE:
+                    self._path_cache.popitem(last=False)
                 return path
 
-        # If not found, construct likely path based on project
-        if project:
-            likely_path = os.path.join(self.claude_sessions_dir, "projects", project, f"{session_id}.jsonl")
-        else:
-            likely_path = os.path.join(self.claude_sessions_dir, f"{session_id}.jsonl")
+        # If not found, the first pattern is the likely path (project path if known)
+        likely_path = patterns[0]
 
         logger.warning(f"Session file not found, using likely path: {likely_path}")
         return likely_path
@@ -123,6 +186,18 @@ class ForkGenerator:
         if not metadata:
             return "No metadata available"
 
+        cache_key = (
+            metadata.project,
+            metadata.created_at,
+            metadata.message_count,
+            metadata.chunk_count,
+            tuple(metadata.tags) if metadata.tags else ()
+        )
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            self._metadata_cache.move_to_end(cache_key)
+            return cached
+
         lines = []
         lines.append(f"Project: {metadata.project or 'Unknown'}")
 
@@ -139,12 +214,19 @@ class ForkGenerator:
         if metadata.tags:
             lines.append(f"Tags: {', '.join(metadata.tags)}")
 
-        return "\n".join(lines)
+        formatted = "\n".join(lines)
+
+        self._metadata_cache[cache_key] = formatted
+        if len(self._metadata_cache) > _METADATA_CACHE_SIZE:
+            self._metadata_cache.popitem(last=False)
+
+        return formatted
 
     def generate_fork_command(
         self,
         session_id: str,
-        metadata: Optional[SessionMetadata] = None
+        metadata: Optional[SessionMetadata] = None,
+        session_path: Optional[str] = None
     ) -> ForkCommand:
         """
         Generate fork commands for a session.
@@ -152,15 +234,17 @@ class ForkGenerator:
         Args:
             session_id: Session ID to fork
             metadata: Optional session metadata
+            session_path: Optional already-resolved session file path; skips the lookup
 
         Returns:
             ForkCommand object with both command modes
         """
         logger.info(f"Generating fork commands for session: {session_id}")
 
-        # Find session file path
-        project = metadata.project if metadata else None
-        session_path = self.find_session_path(session_id, project)
+        # Find session file path unless the caller already resolved it
+        if session_path is None:
+            project = metadata.project if metadata else None
+            session_path = self.find_session_path(session_id, project)
 
         # Generate both commands
         terminal_cmd = self.generate_terminal_command(session_id)
@@ -203,16 +287,15 @@ class ForkGenerator:
         Returns:
             Formatted output string
         """
-        lines = []
-        lines.append("=" * 80)
-        lines.append(f"Fork Command Generated: {fork_command.session_id}")
-        lines.append("=" * 80)
-        lines.append("")
+        lines = [
+            _HEAVY_RULE,
+            f"Fork Command Generated: {fork_command.session_id}",
+            _HEAVY_RULE,
+            "",
+        ]
 
         # Display metadata if available
         if fork_command.metadata:
-            lines.append("Session Details:")
-            lines.append("-" * 80)
             metadata_obj = SessionMetadata(
                 session_id=fork_command.session_id,
                 project=fork_command.metadata.get('project'),
@@ -222,31 +305,30 @@ class ForkGenerator:
                 chunk_count=fork_command.metadata.get('chunk_count', 0),
                 tags=fork_command.metadata.get('tags', [])
             )
-            lines.append(self.format_metadata(metadata_obj))
-            lines.append("")
+            lines.extend([
+                "Session Details:",
+                _LIGHT_RULE,
+                self.format_metadata(metadata_obj),
+                "",
+            ])
 
         # Display fork commands
-        lines.append("Fork Commands:")
-        lines.append("-" * 80)
-        lines.append("")
-        lines.append("Option 1: New Terminal Fork")
-        lines.append(f"  {fork_command.terminal_command}")
-        lines.append("")
-        lines.append("Option 2: In-Session Fork")
-        lines.append(f"  {fork_command.in_session_command}")
-        lines.append("")
-        lines.append("=" * 80)
+        lines.extend([
+            "Fork Commands:",
+            _LIGHT_RULE,
+            "",
+            "Option 1: New Terminal Fork",
+            f"  {fork_command.terminal_command}",
+            "",
+            "Option 2: In-Session Fork",
+            f"  {fork_command.in_session_command}",
+            "",
+            _HEAVY_RULE,
+        ])
 
         # Add execution time if provided
         if execution_time is not None:
-            if execution_time < 60:
-                time_str = f"{execution_time:.0f}s"
-            else:
-                minutes = int(execution_time // 60)
-                seconds = int(execution_time % 60)
-                time_str = f"{minutes}m {seconds}s"
-
-            lines.append(f"✨ Generated in {time_str}")
+            lines.append(f"✨ Generated in {_format_duration(execution_time)}")
 
         return "\n".join(lines)
 
@@ -254,7 +336,8 @@ class ForkGenerator:
         self,
         session_id: str,
         metadata: Optional[SessionMetadata] = None,
-        execution_time: Optional[float] = None
+        execution_time: Optional[float] = None,
+        session_path: Optional[str] = None
     ) -> str:
         """
         Generate fork command and format output in one step.
@@ -263,9 +346,10 @@ class ForkGenerator:
             session_id: Session ID to fork
             metadata: Optional session metadata
             execution_time: Optional execution time in seconds
+            session_path: Optional already-resolved session file path; skips the lookup
 
         Returns:
             Formatted fork command output
         """
-        fork_cmd = self.generate_fork_command(session_id, metadata)
+        fork_cmd = self.generate_fork_command(session_id, metadata, session_path=session_path)
         return self.format_fork_output(fork_cmd, execution_time)
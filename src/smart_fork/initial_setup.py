@@ -18,12 +18,14 @@ import subprocess
 import time
 import json
 import logging
+import queue
 import signal
 import threading
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 from .session_parser import SessionParser
 from .chunking_service import ChunkingService
@@ -159,6 +161,182 @@ class SetupState:
         return SetupState(**data)
 
 
+class _WaitClock:
+    """
+    Accumulates the time a worker spends queued behind other embedding batches.
+
+    The per-file timeout adds this time to its deadline, so a small file is not
+    charged for encodes of other workers' texts. The encode of the batch that
+    carries the file's own texts still counts against the timeout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = 0.0
+        self._started: Optional[float] = None
+
+    def __enter__(self) -> '_WaitClock':
+        with self._lock:
+            self._started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with self._lock:
+            self._total += time.monotonic() - self._started
+            self._started = None
+
+    def elapsed(self) -> float:
+        """Return the time waited so far, including a wait still in progress."""
+        with self._lock:
+            if self._started is None:
+                return self._total
+            return self._total + time.monotonic() - self._started
+
+
+# Texts to embed, the future answered with their embeddings, and an event set
+# once the feeder takes the request into a batch
+_BatchRequest = Tuple[List[str], Future, threading.Event]
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesces embedding requests from worker threads into shared encode calls.
+
+    Workers block in embed_texts() while a single feeder thread drains the
+    request queue, embeds every pending text in one EmbeddingService call and
+    hands each worker back its own slice. Small sessions from different files
+    thus share one large batch instead of each paying for a tiny one.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch_texts: int = 256,
+        wait_timeout: float = 300.0
+    ):
+        """
+        Start the feeder thread.
+
+        Args:
+            embedding_service: Service used for the combined encode calls
+            max_batch_texts: Stop collecting requests once this many texts are pending
+            wait_timeout: Longest a worker waits, both queued and for its own batch
+        """
+        self._embedding_service = embedding_service
+        self._max_batch_texts = max_batch_texts
+        self._wait_timeout = wait_timeout
+        self._requests: "queue.Queue[Optional[_BatchRequest]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def embed_texts(
+        self,
+        texts: List[str],
+        wait_clock: Optional[_WaitClock] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts as part of the next combined batch.
+
+        Args:
+            texts: Texts to embed
+            wait_clock: Optional clock charged with the time spent queued
+
+        Returns:
+            Embeddings in the same order as texts
+
+        Raises:
+            RuntimeError: If the feeder thread has stopped
+            concurrent.futures.TimeoutError: If the request waits longer than
+                wait_timeout to be picked up or for its batch to be encoded
+        """
+        future: Future = Future()
+        picked_up = threading.Event()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Embedding batcher is closed")
+            self._requests.put((texts, future, picked_up))
+
+        with wait_clock or nullcontext():
+            if not picked_up.wait(timeout=self._wait_timeout):
+                raise FuturesTimeoutError()
+        return future.result(timeout=self._wait_timeout)
+
+    def close(self) -> None:
+        """Finish pending requests and stop the feeder thread."""
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Feeder thread: run the feed loop, then fail every unanswered request."""
+        pending: List[_BatchRequest] = []
+        error: BaseException = RuntimeError("Embedding batcher is closed")
+        try:
+            self._feed(pending)
+        except BaseException as e:
+            logger.error(f"Embedding batcher stopped unexpectedly: {e}")
+            error = e
+        finally:
+            # No request can be queued once _stopped is set, so this drain is final
+            with self._lock:
+                self._stopped = True
+            while True:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    pending.append(request)
+            for _, future, picked_up in pending:
+                if not future.done():
+                    future.set_exception(error)
+                picked_up.set()
+
+    def _feed(self, pending: List[_BatchRequest]) -> None:
+        """
+        Collect pending requests and embed them together until closed.
+
+        Args:
+            pending: Requests taken off the queue but not yet answered
+        """
+        stopping = False
+        while not stopping:
+            request = self._requests.get()
+            if request is None:
+                return
+
+            pending.append(request)
+            pending_texts = len(request[0])
+            while pending_texts < self._max_batch_texts:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                pending.append(request)
+                pending_texts += len(request[0])
+
+            texts = [text for request_texts, _, _ in pending for text in request_texts]
+            for _, _, picked_up in pending:
+                picked_up.set()
+            try:
+                embeddings = self._embedding_service.embed_texts(texts)
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                pending.clear()
+                continue
+
+            offset = 0
+            for request_texts, future, _ in pending:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+            pending.clear()
+
+
 class InitialSetup:
     """
     Manages the initial database setup flow.
@@ -211,9 +389,11 @@ class InitialSetup:
         self.vector_db_service: Optional[VectorDBService] = None
         self.session_registry: Optional[SessionRegistry] = None
 
+        # Set while _process_files_parallel runs so workers share encode batches
+        self._embedding_batcher: Optional[_EmbeddingBatcher] = None
+
         self._interrupted = False
         self._progress_lock = threading.Lock()  # Lock for thread-safe progress updates
-        self._state_lock = threading.Lock()  # Lock for thread-safe state updates
 
     def is_first_run(self) -> bool:
         """
@@ -246,11 +426,22 @@ class InitialSetup:
 
         session_files = []
 
-        # Search for .jsonl files recursively
-        for jsonl_file in self.claude_dir.rglob("*.jsonl"):
-            # Skip files that are too small (likely empty or invalid)
-            if jsonl_file.stat().st_size > 100:
-                session_files.append(jsonl_file)
+        # Search for .jsonl files recursively. os.scandir entries carry the
+        # file type from the directory listing, so only candidate files need a
+        # stat call. Like Path.rglob, symlinked directories are not followed.
+        pending_dirs = [str(self.claude_dir)]
+        while pending_dirs:
+            try:
+                with os.scandir(pending_dirs.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                        # Skip files that are too small (likely empty or invalid)
+                        elif (entry.name.endswith(".jsonl") and entry.is_file()
+                              and entry.stat().st_size > 100):
+                            session_files.append(Path(entry.path))
+            except OSError as e:
+                logger.warning(f"Cannot scan directory: {e}")
 
         logger.info(f"Found {len(session_files)} session files")
         return sorted(session_files)
@@ -347,10 +538,24 @@ class InitialSetup:
         Returns:
             Dictionary with processing results
         """
+        wait_clock = _WaitClock() if self._embedding_batcher is not None else None
         try:
             with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(self._process_session_file, file_path, session_id)
-                return future.result(timeout=self.timeout_per_session)
+                future = executor.submit(
+                    self._process_session_file, file_path, session_id, wait_clock
+                )
+                if wait_clock is None:
+                    return future.result(timeout=self.timeout_per_session)
+
+                # Time queued behind other workers' batches extends the deadline
+                deadline = time.monotonic() + self.timeout_per_session
+                while True:
+                    remaining = deadline + wait_clock.elapsed() - time.monotonic()
+                    try:
+                        return future.result(timeout=max(remaining, 0.0))
+                    except FuturesTimeoutError:
+                        if time.monotonic() >= deadline + wait_clock.elapsed():
+                            raise
         except FuturesTimeoutError:
             session_id = session_id or file_path.stem
             file_size = file_path.stat().st_size
@@ -379,7 +584,8 @@ class InitialSetup:
     def _process_session_file(
         self,
         file_path: Path,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        wait_clock: Optional[_WaitClock] = None
     ) -> Dict[str, Any]:
         """
         Process a single session file.
@@ -387,6 +593,7 @@ class InitialSetup:
         Args:
             file_path: Path to session file
             session_id: Optional session ID (derived from filename if not provided)
+            wait_clock: Optional clock charged with time spent queued in the batcher
 
         Returns:
             Dictionary with processing results
@@ -422,8 +629,12 @@ class InitialSetup:
             # Extract text from chunks
             chunk_texts = [chunk.content for chunk in chunks]
 
-            # Generate embeddings
-            embeddings = self.embedding_service.embed_texts(chunk_texts)
+            # Generate embeddings (batched with other workers when running in parallel)
+            batcher = self._embedding_batcher
+            if batcher is not None:
+                embeddings = batcher.embed_texts(chunk_texts, wait_clock)
+            else:
+                embeddings = self.embedding_service.embed_texts(chunk_texts)
 
             # Prepare chunks for vector DB
             chunk_ids = []
@@ -685,6 +896,39 @@ class InitialSetup:
         """
         Process files in parallel using thread pool.
 
+        Workers parse and chunk their files independently; embedding requests
+        are funnelled through one _EmbeddingBatcher so that chunks from several
+        files are encoded together.
+
+        Args:
+            files_to_process: List of files to process
+            all_files: All session files (for progress tracking)
+            state: Setup state object
+            start_time: Start time of setup
+
+        Returns:
+            Dictionary with processing results
+        """
+        self._embedding_batcher = _EmbeddingBatcher(
+            self.embedding_service,
+            wait_timeout=self.timeout_per_session
+        )
+        try:
+            return self._process_files_in_pool(files_to_process, all_files, state, start_time)
+        finally:
+            self._embedding_batcher.close()
+            self._embedding_batcher = None
+
+    def _process_files_in_pool(
+        self,
+        files_to_process: List[Path],
+        all_files: List[Path],
+        state: SetupState,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Run the worker thread pool for _process_files_parallel.
+
         Args:
             files_to_process: List of files to process
             all_files: All session files (for progress tracking)
@@ -716,8 +960,7 @@ class InitialSetup:
                     for f in future_to_file:
                         f.cancel()
                     # Save state
-                    with self._state_lock:
-                        self._save_state(state)
+                    self._save_state(state)
                     return {
                         'total_chunks': total_chunks,
                         'errors': errors,
@@ -728,29 +971,29 @@ class InitialSetup:
                 file_path = future_to_file[future]
                 result = future.result()
 
-                # Update state and statistics with thread safety
-                with self._state_lock:
-                    file_str = str(file_path)
-                    if result['success']:
-                        total_chunks += result['chunks']
-                        state.processed_files.append(file_str)
-                    elif result.get('timed_out', False):
-                        state.timed_out_files.append(file_str)
-                        state.processed_files.append(file_str)
-                        timeouts.append({
-                            'file': file_path.name,
-                            'error': result.get('error', 'Unknown timeout'),
-                            'file_size': _format_bytes(file_path.stat().st_size)
-                        })
-                    else:
-                        errors.append({
-                            'file': file_path.name,
-                            'error': result.get('error', 'Unknown error')
-                        })
-
-                    # Update state periodically
-                    state.last_updated = time.time()
-                    self._save_state(state)
+                # Workers only return results; setup state is updated here on the
+                # consuming thread alone, so it needs no lock
+                file_str = str(file_path)
+                if result['success']:
+                    total_chunks += result['chunks']
+                    state.processed_files.append(file_str)
+                elif result.get('timed_out', False):
+                    state.timed_out_files.append(file_str)
+                    state.processed_files.append(file_str)
+                    timeouts.append({
+                        'file': file_path.name,
+                        'error': result.get('error', 'Unknown timeout'),
+                        'file_size': _format_bytes(file_path.stat().st_size)
+                    })
+                else:
+                    errors.append({
+                        'file': file_path.name,
+                        'error': result.get('error', 'Unknown error')
+                    })
+
+                # Update state periodically
+                state.last_updated = time.time()
+                self._save_state(state)
 
                 # Notify progress (with lock for thread safety)
                 with self._progress_lock:
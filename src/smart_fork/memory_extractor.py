@@ -11,11 +11,62 @@ to enable memory-based score boosting during search.
 """
 
 import re
-from typing import List, Set, Optional
+from typing import List, Set, Optional, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+# Score boost per memory type (from PRD) and its bit in a memory type mask
+_MEMORY_TYPE_BOOSTS = (
+    ('PATTERN', 0.05),
+    ('WORKING_SOLUTION', 0.08),
+    ('WAITING', 0.02),
+)
+_MEMORY_TYPE_BITS = {memory_type: 1 << i for i, (memory_type, _) in enumerate(_MEMORY_TYPE_BOOSTS)}
+
+# Total boost for every combination of memory types, indexed by mask
+_BOOST_BY_MASK = tuple(
+    sum((boost for i, (_, boost) in enumerate(_MEMORY_TYPE_BOOSTS) if mask & (1 << i)), 0.0)
+    for mask in range(1 << len(_MEMORY_TYPE_BOOSTS))
+)
+_ALL_MEMORY_TYPES_MASK = (1 << len(_MEMORY_TYPE_BOOSTS)) - 1
+
+# Sorted memory type names for every combination of memory types, indexed by mask
+_TYPES_BY_MASK = tuple(
+    tuple(sorted(memory_type for memory_type, bit in _MEMORY_TYPE_BITS.items() if mask & bit))
+    for mask in range(_ALL_MEMORY_TYPES_MASK + 1)
+)
+
+
+def _keyword_literal(keyword_pattern: str) -> str:
+    """Strip the \\b anchors from a keyword pattern, leaving the lowercase literal."""
+    return keyword_pattern.removeprefix(r'\b').removesuffix(r'\b').lower()
+
+
+def _is_word_char(char: str) -> bool:
+    """Check whether a character counts as a word character for \\b."""
+    return char.isalnum() or char == '_'
+
+
+def _contains_word(text: str, word: str) -> bool:
+    """
+    Check whether a word occurs in text with word boundaries on both sides.
+
+    Uses str.find, which scans in C, and only checks the boundary characters
+    around each candidate.
+    """
+    text_len = len(text)
+    word_len = len(word)
+    index = text.find(word)
+    while index != -1:
+        end = index + word_len
+        if ((index == 0 or not _is_word_char(text[index - 1])) and
+                (end == text_len or not _is_word_char(text[end]))):
+            return True
+        index = text.find(word, index + 1)
+    return False
+
+
+@dataclass(slots=True)
 class MemoryMarker:
     """Represents a detected memory marker in content."""
     memory_type: str  # PATTERN, WORKING_SOLUTION, or WAITING
@@ -66,6 +117,25 @@ class MemoryExtractor:
         r'\bblocked\b',
     ]
 
+    # Compiled once when the class is defined and shared by all instances
+    pattern_regex = re.compile('|'.join(PATTERN_KEYWORDS), re.IGNORECASE)
+    working_solution_regex = re.compile('|'.join(WORKING_SOLUTION_KEYWORDS), re.IGNORECASE)
+    waiting_regex = re.compile('|'.join(WAITING_KEYWORDS), re.IGNORECASE)
+
+    # Case-sensitive variants run against lowercased ASCII content
+    _lowercase_regexes = (
+        ('PATTERN', re.compile('|'.join(PATTERN_KEYWORDS))),
+        ('WORKING_SOLUTION', re.compile('|'.join(WORKING_SOLUTION_KEYWORDS))),
+        ('WAITING', re.compile('|'.join(WAITING_KEYWORDS))),
+    )
+
+    # Lowercase keyword literals per type for the ASCII fast path
+    _keyword_literals = (
+        ('PATTERN', tuple(map(_keyword_literal, PATTERN_KEYWORDS))),
+        ('WORKING_SOLUTION', tuple(map(_keyword_literal, WORKING_SOLUTION_KEYWORDS))),
+        ('WAITING', tuple(map(_keyword_literal, WAITING_KEYWORDS))),
+    )
+
     def __init__(self, context_window: int = 100):
         """
         Initialize the MemoryExtractor.
@@ -75,20 +145,6 @@ class MemoryExtractor:
         """
         self.context_window = context_window
 
-        # Compile regex patterns for efficiency
-        self.pattern_regex = re.compile(
-            '|'.join(self.PATTERN_KEYWORDS),
-            re.IGNORECASE
-        )
-        self.working_solution_regex = re.compile(
-            '|'.join(self.WORKING_SOLUTION_KEYWORDS),
-            re.IGNORECASE
-        )
-        self.waiting_regex = re.compile(
-            '|'.join(self.WAITING_KEYWORDS),
-            re.IGNORECASE
-        )
-
     def extract_memory_types(self, content: str) -> List[str]:
         """
         Extract all memory types present in the content.
@@ -99,18 +155,7 @@ class MemoryExtractor:
         Returns:
             List of unique memory types found (e.g., ['PATTERN', 'WORKING_SOLUTION'])
         """
-        memory_types = set()
-
-        if self.pattern_regex.search(content):
-            memory_types.add('PATTERN')
-
-        if self.working_solution_regex.search(content):
-            memory_types.add('WORKING_SOLUTION')
-
-        if self.waiting_regex.search(content):
-            memory_types.add('WAITING')
-
-        return sorted(list(memory_types))  # Sort for consistent ordering
+        return list(_TYPES_BY_MASK[self._memory_type_mask(content)])
 
     def extract_markers(self, content: str) -> List[MemoryMarker]:
         """
@@ -122,39 +167,50 @@ class MemoryExtractor:
         Returns:
             List of MemoryMarker objects with type, context, and position
         """
-        markers = []
-
-        # Find PATTERN markers
-        for match in self.pattern_regex.finditer(content):
-            context = self._extract_context(content, match.start())
-            markers.append(MemoryMarker(
-                memory_type='PATTERN',
-                context=context,
-                position=match.start()
-            ))
-
-        # Find WORKING_SOLUTION markers
-        for match in self.working_solution_regex.finditer(content):
-            context = self._extract_context(content, match.start())
-            markers.append(MemoryMarker(
-                memory_type='WORKING_SOLUTION',
-                context=context,
-                position=match.start()
-            ))
-
-        # Find WAITING markers
-        for match in self.waiting_regex.finditer(content):
-            context = self._extract_context(content, match.start())
-            markers.append(MemoryMarker(
-                memory_type='WAITING',
-                context=context,
-                position=match.start()
-            ))
-
-        # Sort by position
-        markers.sort(key=lambda m: m.position)
-
-        return markers
+        memory_types, positions, contexts = self.extract_markers_columnar(content)
+        return [
+            MemoryMarker(memory_type=memory_type, context=context, position=position)
+            for memory_type, position, context in zip(memory_types, positions, contexts)
+        ]
+
+    def extract_markers_columnar(self, content: str) -> Tuple[List[str], List[int], List[str]]:
+        """
+        Extract all memory markers as parallel lists instead of MemoryMarker objects.
+
+        Useful for bulk processing that only needs one field, e.g. the types.
+
+        Args:
+            content: The text content to analyze
+
+        Returns:
+            Tuple of (memory_types, positions, contexts), sorted by position
+        """
+        if content.isascii():
+            # Lowercasing ASCII keeps offsets, so positions still index into content
+            search_content = content.lower()
+            regexes = self._lowercase_regexes
+        else:
+            search_content = content
+            regexes = (
+                ('PATTERN', self.pattern_regex),
+                ('WORKING_SOLUTION', self.working_solution_regex),
+                ('WAITING', self.waiting_regex),
+            )
+
+        memory_types = []
+        positions = []
+        for memory_type, regex in regexes:
+            for match in regex.finditer(search_content):
+                memory_types.append(memory_type)
+                positions.append(match.start())
+
+        # Sort by position (stable, so ties keep type order)
+        order = sorted(range(len(positions)), key=positions.__getitem__)
+        memory_types = [memory_types[i] for i in order]
+        positions = [positions[i] for i in order]
+        contexts = [self._extract_context(content, position) for position in positions]
+
+        return memory_types, positions, contexts
 
     def _extract_context(self, content: str, position: int) -> str:
         """
@@ -191,17 +247,13 @@ class MemoryExtractor:
         Returns:
             True if the memory type is present, False otherwise
         """
-        memory_type = memory_type.upper()
-
-        if memory_type == 'PATTERN':
-            return self.pattern_regex.search(content) is not None
-        elif memory_type == 'WORKING_SOLUTION':
-            return self.working_solution_regex.search(content) is not None
-        elif memory_type == 'WAITING':
-            return self.waiting_regex.search(content) is not None
-        else:
+        bit = _MEMORY_TYPE_BITS.get(memory_type.upper())
+        if bit is None:
             return False
 
+        # Skip every other type so only the requested one is scanned for
+        return self._memory_type_mask(content, skip_mask=_ALL_MEMORY_TYPES_MASK & ~bit) != 0
+
     def get_memory_boost(self, memory_types: List[str]) -> float:
         """
         Calculate total memory boost for a list of memory types.
@@ -211,23 +263,19 @@ class MemoryExtractor:
         - WORKING_SOLUTION: +8%
         - WAITING: +2%
 
+        Each type counts once, as in ScoringService; unknown types are ignored.
+
         Args:
             memory_types: List of memory types present
 
         Returns:
             Total boost as a decimal (e.g., 0.13 for 13% boost)
         """
-        boost = 0.0
-
+        mask = 0
         for memory_type in memory_types:
-            if memory_type == 'PATTERN':
-                boost += 0.05
-            elif memory_type == 'WORKING_SOLUTION':
-                boost += 0.08
-            elif memory_type == 'WAITING':
-                boost += 0.02
+            mask |= _MEMORY_TYPE_BITS.get(memory_type, 0)
 
-        return boost
+        return _BOOST_BY_MASK[mask]
 
     def extract_from_messages(self, messages: List[dict]) -> List[str]:
         """
@@ -239,12 +287,47 @@ class MemoryExtractor:
         Returns:
             List of unique memory types found across all messages
         """
-        memory_types = set()
+        found_mask = 0
 
         for message in messages:
             content = message.get('content', '')
             if isinstance(content, str):
-                types = self.extract_memory_types(content)
-                memory_types.update(types)
+                found_mask |= self._memory_type_mask(content, skip_mask=found_mask)
+                # Nothing left to find in the remaining messages
+                if found_mask == _ALL_MEMORY_TYPES_MASK:
+                    break
+
+        return list(_TYPES_BY_MASK[found_mask])
+
+    def _memory_type_mask(self, content: str, skip_mask: int = 0) -> int:
+        """
+        Detect memory types in content as a bitmask of _MEMORY_TYPE_BITS.
 
-        return sorted(list(memory_types))
+        Args:
+            content: The text content to analyze
+            skip_mask: Types already found elsewhere; these are not scanned for
+
+        Returns:
+            Mask of the memory types found (excluding skipped ones)
+        """
+        mask = 0
+        if content.isascii():
+            # Lowercasing ASCII keeps offsets, so each keyword can be found with
+            # str.find on one lowercased copy instead of a case-insensitive regex scan
+            content_lower = content.lower()
+            for memory_type, literals in self._keyword_literals:
+                bit = _MEMORY_TYPE_BITS[memory_type]
+                if not skip_mask & bit and any(
+                        _contains_word(content_lower, literal) for literal in literals):
+                    mask |= bit
+            return mask
+
+        for memory_type, regex in (
+            ('PATTERN', self.pattern_regex),
+            ('WORKING_SOLUTION', self.working_solution_regex),
+            ('WAITING', self.waiting_regex),
+        ):
+            bit = _MEMORY_TYPE_BITS[memory_type]
+            if not skip_mask & bit and regex.search(content):
+                mask |= bit
+        return mask
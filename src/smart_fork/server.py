@@ -6,9 +6,15 @@ import os
 import logging
 import signal
 import atexit
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .embedding_service import EmbeddingService
 from .vector_db_service import VectorDBService
 from .scoring_service import ScoringService
@@ -38,6 +44,42 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _json_loads(data: str) -> Any:
+    """Parse a JSON message, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a JSON message to UTF-8, using orjson when it is installed.
+
+    Values orjson cannot encode (e.g. integers wider than 64 bits) fall back
+    to the stdlib, whose ASCII-escaped output is also valid UTF-8.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode("ascii")
+
+
+def _write_message(obj: Any) -> None:
+    """Write one JSON message line to stdout.
+
+    The bytes go to the binary buffer so raw UTF-8 from orjson cannot hit a
+    non-UTF-8 locale encoding; streams without a buffer get ASCII-escaped text.
+    """
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(json.dumps(obj), flush=True)
+        return
+    sys.stdout.flush()
+    buffer.write(_json_dumps(obj) + b"\n")
+    buffer.flush()
+
+
 class MCPServer:
     """Basic MCP server implementing JSON-RPC 2.0 over stdio."""
 
@@ -54,6 +96,8 @@ class MCPServer:
         }
         self.search_service = search_service
         self.background_indexer = background_indexer
+        # tools/list result, rebuilt lazily after a tool is registered
+        self._tools_list_cache: Optional[Tuple[Dict[str, Any], ...]] = None
 
     def register_tool(
         self,
@@ -69,6 +113,7 @@ class MCPServer:
             "inputSchema": input_schema,
             "handler": handler
         }
+        self._tools_list_cache = None
 
     def handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialize request."""
@@ -82,15 +127,19 @@ class MCPServer:
 
     def handle_tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/list request."""
-        tools_list = [
-            {
-                "name": tool["name"],
-                "description": tool["description"],
-                "inputSchema": tool["inputSchema"]
-            }
-            for tool in self.tools.values()
-        ]
-        return {"tools": tools_list}
+        if self._tools_list_cache is None:
+            # Sorted by name so the same tool set always lists identically
+            self._tools_list_cache = tuple(
+                {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "inputSchema": tool["inputSchema"]
+                }
+                for _, tool in sorted(self.tools.items())
+            )
+        # Fresh containers per reply so a caller editing the result cannot
+        # change what later tools/list requests return
+        return {"tools": [dict(tool) for tool in self._tools_list_cache]}
 
     def handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/call request."""
@@ -112,9 +161,57 @@ class MCPServer:
             ]
         }
 
-    def handle_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Handle a JSON-RPC request."""
+    def handle_request(
+        self,
+        request: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Handle a JSON-RPC request or a batch of requests."""
+        if isinstance(request, list):
+            return self.handle_batch(request)
+        return self._handle_single_request(request)
+
+    def handle_batch(self, batch: List[Dict[str, Any]]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Handle a JSON-RPC batch.
+
+        Returns the responses in request order, None if the batch held only
+        notifications, or a single error response for an empty batch.
+        """
+        if not batch:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request: empty batch"
+                }
+            }
+
+        responses = []
+        for request in batch:
+            if not isinstance(request, dict):
+                responses.append({
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32600,
+                        "message": "Invalid Request: batch entries must be objects"
+                    }
+                })
+                continue
+            response = self._handle_single_request(request)
+            if response is not None:
+                responses.append(response)
+        return responses or None
+
+    def _handle_single_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Handle a single JSON-RPC request."""
         method = request.get("method")
+
+        # Notifications never get a response
+        if isinstance(method, str) and method.startswith("notifications/"):
+            return None
+
         params = request.get("params", {})
         request_id = request.get("id")
 
@@ -125,9 +222,6 @@ class MCPServer:
                 result = self.handle_tools_list(params)
             elif method == "tools/call":
                 result = self.handle_tools_call(params)
-            elif method == "notifications/initialized":
-                # Notification, no response needed
-                return None
             else:
                 raise ValueError(f"Unknown method: {method}")
 
@@ -165,18 +259,25 @@ class MCPServer:
                 continue
 
             try:
-                request = json.loads(line)
+                request = _json_loads(line)
                 response = self.handle_request(request)
 
                 if response is not None:
-                    print(json.dumps(response), flush=True)
+                    _write_message(response)
 
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON: {e}", file=sys.stderr)
             except Exception as e:
                 print(f"Error handling request: {e}", file=sys.stderr)
 
 
+@lru_cache(maxsize=8)
+def _get_fork_generator(claude_dir: str) -> ForkGenerator:
+    """Get the shared ForkGenerator for a Claude directory."""
+    return ForkGenerator(claude_sessions_dir=claude_dir)
+
+
 def format_search_results_with_selection(
     query: str,
     results: List[Any],
@@ -197,10 +298,6 @@ def format_search_results_with_selection(
     Returns:
         Formatted selection prompt
     """
-    # Create ForkGenerator for generating fork commands
-    fork_generator = ForkGenerator(claude_sessions_dir=claude_dir or "~/.claude")
-    selection_ui = SelectionUI(fork_generator=fork_generator)
-
     if not results:
         # Get database stats if available
         stats_info = ""
@@ -243,6 +340,9 @@ Options:
 Tip: The system searches through all your past Claude Code sessions to find relevant work.
 """
 
+    # Reuse the ForkGenerator for this directory so its path and metadata caches carry over
+    selection_ui = SelectionUI(fork_generator=_get_fork_generator(claude_dir or "~/.claude"))
+
     # Display selection UI
     selection_data = selection_ui.display_selection(
         results,
@@ -323,7 +323,7 @@ class SessionArchiveService:
         all_sessions = self.session_registry.get_all_sessions()
         archived_sessions = [
             metadata for metadata in all_sessions.values()
-            if metadata.__dict__.get('archived', False)
+            if metadata.archived
         ]
 
         # Find oldest and newest dates
@@ -363,7 +363,7 @@ class SessionArchiveService:
         all_sessions = self.session_registry.get_all_sessions()
         archived = [
             metadata for metadata in all_sessions.values()
-            if metadata.__dict__.get('archived', False)
+            if metadata.archived
         ]
         return archived
 
@@ -380,4 +380,4 @@ class SessionArchiveService:
         metadata = self.session_registry.get_session(session_id)
         if not metadata:
             return False
-        return metadata.__dict__.get('archived', False)
+        return metadata.archived
@@ -12,10 +12,21 @@ from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _json_loads(line: str) -> Any:
+    """Parse one JSONL line, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
 @dataclass
 class SessionMessage:
     """Represents a single message in a session."""
@@ -118,7 +129,7 @@ class SessionParser:
                         continue
 
                     try:
-                        data = json.loads(line)
+                        data = _json_loads(line)
                         message = self._parse_message(data)
                         if message:
                             messages.append(message)
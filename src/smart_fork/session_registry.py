@@ -13,7 +13,7 @@ from datetime import datetime
 import threading
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionMetadata:
     """Represents metadata for a single session."""
     session_id: str
@@ -8,7 +8,7 @@ session chunks with embeddings, supporting CRUD operations and similarity search
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import chromadb
 from chromadb.config import Settings
@@ -73,7 +73,7 @@ class VectorDBService:
         self,
         chunks: List[str],
         embeddings: List[List[float]],
-        metadata: List[Dict[str, Any]],
+        metadata: Union[List[Dict[str, Any]], Dict[str, Any]],
         chunk_ids: Optional[List[str]] = None
     ) -> List[str]:
         """
@@ -82,7 +82,8 @@ class VectorDBService:
         Args:
             chunks: List of text chunks to add
             embeddings: List of embedding vectors (must match chunks length)
-            metadata: List of metadata dicts (must match chunks length)
+            metadata: List of metadata dicts (must match chunks length), or a
+                     single dict that applies to every chunk
             chunk_ids: Optional list of custom IDs. If None, auto-generated.
 
         Returns:
@@ -100,10 +101,16 @@ class VectorDBService:
                 f"Chunks count ({len(chunks)}) must match embeddings count ({len(embeddings)})"
             )
 
-        if len(chunks) != len(metadata):
+        if isinstance(metadata, dict):
+            # Uniform metadata: convert it once and share it across all chunks
+            processed_metadata = [self._serialize_metadata(metadata)] * len(chunks)
+            metadata = [metadata] * len(chunks)
+        elif len(chunks) != len(metadata):
             raise ValueError(
                 f"Chunks count ({len(chunks)}) must match metadata count ({len(metadata)})"
             )
+        else:
+            processed_metadata = [self._serialize_metadata(meta) for meta in metadata]
 
         # Generate IDs if not provided
         if chunk_ids is None:
@@ -119,24 +126,6 @@ class VectorDBService:
                 f"Chunk IDs count ({len(chunk_ids)}) must match chunks count ({len(chunks)})"
             )
 
-        # Convert metadata to chromadb format (all values must be strings, ints, floats, or bools)
-        processed_metadata = []
-        for meta in metadata:
-            processed = {}
-            for key, value in meta.items():
-                # Convert to supported types
-                if isinstance(value, (str, int, float, bool)):
-                    processed[key] = value
-                elif value is None:
-                    processed[key] = ""
-                elif isinstance(value, list):
-                    # Serialize lists to JSON string (e.g., memory_types)
-                    processed[key] = json.dumps(value)
-                else:
-                    # Convert other types to string
-                    processed[key] = str(value)
-            processed_metadata.append(processed)
-
         # Add to collection
         self.collection.add(
             ids=chunk_ids,
@@ -152,6 +141,34 @@ class VectorDBService:
 
         return chunk_ids
 
+    def _serialize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert metadata to ChromaDB format.
+
+        ChromaDB only accepts strings, ints, floats and bools, so lists
+        (e.g., memory_types) are JSON-serialized and None becomes "".
+
+        Args:
+            metadata: Metadata dictionary for one chunk
+
+        Returns:
+            Metadata dictionary with ChromaDB-compatible values
+        """
+        processed = {}
+        for key, value in metadata.items():
+            # Convert to supported types
+            if isinstance(value, (str, int, float, bool)):
+                processed[key] = value
+            elif value is None:
+                processed[key] = ""
+            elif isinstance(value, list):
+                # Serialize lists to JSON string (e.g., memory_types)
+                processed[key] = json.dumps(value)
+            else:
+                # Convert other types to string
+                processed[key] = str(value)
+        return processed
+
     def _deserialize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deserialize metadata from ChromaDB format back to Python types.
@@ -0,0 +1,56 @@
+"""Shared assertions for JSON-RPC responses in the MCP test modules."""
+
+from typing import Any, Dict, Optional
+
+# Tools every configured server must expose
+CORE_TOOLS = frozenset({"fork-detect", "get-session-preview", "record-fork", "get-fork-history"})
+
+# Fields every tools/list entry must carry
+TOOL_FIELDS = frozenset({"name", "description", "inputSchema"})
+
+
+def expect_success(response: Optional[Dict[str, Any]], rid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Assert that a response is a successful JSON-RPC reply.
+
+    Args:
+        response: Response returned by MCPServer.handle_request
+        rid: Expected request ID, or None to skip the ID check
+
+    Returns:
+        The response's result payload
+    """
+    assert response is not None
+    assert response["jsonrpc"] == "2.0"
+    assert "result" in response
+    assert "error" not in response
+    if rid is not None:
+        assert response["id"] == rid
+    return response["result"]
+
+
+def expect_error(
+    response: Optional[Dict[str, Any]],
+    code: int = -32603,
+    rid: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Assert that a response is a JSON-RPC error reply.
+
+    Args:
+        response: Response returned by MCPServer.handle_request
+        code: Expected error code
+        rid: Expected request ID, or None to skip the ID check
+
+    Returns:
+        The response's error object
+    """
+    assert response is not None
+    assert response["jsonrpc"] == "2.0"
+    assert "error" in response
+    assert "result" not in response
+    assert response["error"]["code"] == code
+    assert isinstance(response["error"]["message"], str)
+    if rid is not None:
+        assert response["id"] == rid
+    return response["error"]
@@ -0,0 +1,27 @@
+"""Lightweight stand-ins for search service dependencies in MCP tests.
+
+Tests that patch SearchService.search never reach these services, so the
+stubs only expose what the fork-detect formatting path reads.
+"""
+
+from typing import Any, Dict
+
+
+class StubEmbeddingService:
+    """Stand-in for EmbeddingService."""
+
+
+class StubVectorDBService:
+    """Stand-in for VectorDBService."""
+
+
+class StubScoringService:
+    """Stand-in for ScoringService."""
+
+
+class StubSessionRegistry:
+    """Stand-in for SessionRegistry reporting an empty database."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return registry stats for an empty database."""
+        return {"total_sessions": 0}
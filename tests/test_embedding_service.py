@@ -1,6 +1,8 @@
 """Tests for EmbeddingService."""
 
 import gc
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import numpy as np
@@ -177,6 +179,25 @@ class TestEmbeddingService:
         # Should only be called once
         assert mock_transformer.call_count == 1
 
+    @patch("smart_fork.embedding_service.SentenceTransformer")
+    def test_load_model_once_across_threads(self, mock_transformer):
+        """Test that concurrent load_model calls load the model only once."""
+        def slow_load(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        mock_transformer.side_effect = slow_load
+
+        service = EmbeddingService(use_cache=False)
+        threads = [threading.Thread(target=service.load_model) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_transformer.call_count == 1
+        assert service.model is not None
+
     @patch("smart_fork.embedding_service.SentenceTransformer")
     def test_load_model_error(self, mock_transformer):
         """Test model loading error handling."""
@@ -203,6 +224,29 @@ class TestEmbeddingService:
         assert len(embeddings[0]) == 384
         mock_model.encode.assert_called_once()
 
+    @patch("smart_fork.embedding_service.SentenceTransformer")
+    @patch("psutil.virtual_memory")
+    def test_embed_texts_survives_unload_after_load(self, mock_memory, mock_transformer):
+        """Test that an unload right after the lazy load does not break embedding."""
+        mock_memory.return_value = MagicMock(available=2 * 1024 * 1024 * 1024)
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([[0.1] * 384])
+        mock_transformer.return_value = mock_model
+
+        service = EmbeddingService(use_cache=False)
+        load_model = service.load_model
+
+        def load_then_unload():
+            model = load_model()
+            service.unload_model()
+            return model
+
+        service.load_model = load_then_unload
+        embeddings = service.embed_texts(["test text"])
+
+        assert len(embeddings) == 1
+        mock_model.encode.assert_called_once()
+
     @patch("smart_fork.embedding_service.SentenceTransformer")
     @patch("psutil.virtual_memory")
     def test_embed_texts_list(self, mock_memory, mock_transformer):
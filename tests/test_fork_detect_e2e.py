@@ -5,27 +5,66 @@ This test suite simulates the complete user journey from invoking /fork-detect
 to generating fork commands, covering all UI options and error states.
 """
 
-import json
-import os
 import tempfile
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock
 
 import pytest
 
-from smart_fork.server import MCPServer, create_server, initialize_services
+from smart_fork.server import create_server
 from smart_fork.search_service import SearchService, SessionSearchResult
 from smart_fork.selection_ui import SelectionUI
 from smart_fork.fork_generator import ForkGenerator
-from smart_fork.session_parser import SessionMessage
-from smart_fork.chunking_service import ChunkingService
 from smart_fork.embedding_service import EmbeddingService
-from smart_fork.vector_db_service import VectorDBService
-from smart_fork.scoring_service import ScoringService, SessionScore
-from smart_fork.session_registry import SessionRegistry
+from smart_fork.scoring_service import SessionScore
+from smart_fork.session_registry import SessionMetadata, SessionRegistry
+
+
+# Shared 384-dimensional mock embedding. SearchService treats embeddings as
+# plain lists (it truth-tests them), so a list constant is used rather than
+# an ndarray; it is allocated once instead of on every fixture call.
+_EMBED = [0.1] * 384
+_EMBED_BATCH = [_EMBED]
+
+# Fixed reference time so fixtures don't read the clock on every construction.
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+_ISO_NOW = NOW.isoformat()
+_ISO_2D = (NOW - timedelta(days=2)).isoformat()
+_ISO_5D = (NOW - timedelta(days=5)).isoformat()
+_ISO_10D = (NOW - timedelta(days=10)).isoformat()
+
+_SINGLE_RESULT = SessionSearchResult(
+    session_id="session-only",
+    score=SessionScore(
+        session_id="session-only",
+        best_similarity=0.9,
+        avg_similarity=0.8,
+        chunk_ratio=0.7,
+        recency_score=0.95,
+        chain_quality=0.5,
+        memory_boost=0.0,
+        preference_boost=0.0,
+        final_score=0.85,
+        num_chunks_matched=2
+    ),
+    metadata=SessionMetadata(
+        session_id="session-only",
+        project="test",
+        created_at=_ISO_NOW,
+        message_count=10,
+        chunk_count=3,
+        tags=[]
+    ),
+    preview="Only result",
+    matched_chunks=[]
+)
+
+
+def _fork_detect(server, query: str) -> str:
+    """Call the fork-detect tool and return its text reply."""
+    result = server.handle_tools_call({"name": "fork-detect", "arguments": {"query": query}})
+    return result["content"][0]["text"]
 
 
 class TestForkDetectEndToEnd:
@@ -54,16 +93,18 @@ class TestForkDetectEndToEnd:
                     recency_score=0.95,
                     chain_quality=0.5,
                     memory_boost=0.08,
+                    preference_boost=0.0,
                     final_score=0.876,
                     num_chunks_matched=5
                 ),
-                metadata={
-                    "project": "my-project",
-                    "created_at": (datetime.now() - timedelta(days=2)).isoformat(),
-                    "message_count": 45,
-                    "chunk_count": 12,
-                    "tags": ["authentication", "bug-fix"]
-                },
+                metadata=SessionMetadata(
+                    session_id="session-123",
+                    project="my-project",
+                    created_at=_ISO_2D,
+                    message_count=45,
+                    chunk_count=12,
+                    tags=["authentication", "bug-fix"]
+                ),
                 preview="Implemented JWT authentication with refresh tokens. Working solution tested.",
                 matched_chunks=[]
             ),
@@ -77,16 +118,18 @@ class TestForkDetectEndToEnd:
                     recency_score=0.90,
                     chain_quality=0.5,
                     memory_boost=0.05,
+                    preference_boost=0.0,
                     final_score=0.824,
                     num_chunks_matched=4
                 ),
-                metadata={
-                    "project": "my-project",
-                    "created_at": (datetime.now() - timedelta(days=5)).isoformat(),
-                    "message_count": 32,
-                    "chunk_count": 9,
-                    "tags": ["api", "design-pattern"]
-                },
+                metadata=SessionMetadata(
+                    session_id="session-456",
+                    project="my-project",
+                    created_at=_ISO_5D,
+                    message_count=32,
+                    chunk_count=9,
+                    tags=["api", "design-pattern"]
+                ),
                 preview="Designed REST API architecture using repository pattern. Approach documented.",
                 matched_chunks=[]
             ),
@@ -100,16 +143,18 @@ class TestForkDetectEndToEnd:
                     recency_score=0.85,
                     chain_quality=0.5,
                     memory_boost=0.02,
+                    preference_boost=0.0,
                     final_score=0.762,
                     num_chunks_matched=3
                 ),
-                metadata={
-                    "project": "other-project",
-                    "created_at": (datetime.now() - timedelta(days=10)).isoformat(),
-                    "message_count": 28,
-                    "chunk_count": 8,
-                    "tags": ["database", "waiting"]
-                },
+                metadata=SessionMetadata(
+                    session_id="session-789",
+                    project="other-project",
+                    created_at=_ISO_10D,
+                    message_count=28,
+                    chunk_count=8,
+                    tags=["database", "waiting"]
+                ),
                 preview="Database migration pending. Waiting for review before proceeding.",
                 matched_chunks=[]
             )
@@ -118,6 +163,34 @@ class TestForkDetectEndToEnd:
         service.search.return_value = results
         return service
 
+    @pytest.fixture
+    def fork_setup(self, temp_storage):
+        """Create a ForkGenerator with a dummy session file on disk.
+
+        Returns:
+            Tuple of (generator, session_id, metadata)
+        """
+        generator = ForkGenerator(claude_sessions_dir=temp_storage)
+
+        session_id = "session-123"
+        metadata = SessionMetadata(
+            session_id=session_id,
+            project="my-project",
+            created_at=_ISO_NOW,
+            message_count=45,
+            chunk_count=12
+        )
+
+        session_file = Path(temp_storage) / f"{session_id}.jsonl"
+        session_file.write_text('{"role": "user", "content": "test"}\n')
+
+        return generator, session_id, metadata
+
+    @pytest.fixture
+    def selection_options(self, mock_search_service):
+        """Create selection options once from the mock search results."""
+        return SelectionUI().create_options(mock_search_service.search.return_value, "test")
+
     @pytest.fixture
     def mcp_server(self, mock_search_service):
         """Create an MCP server with mock search service."""
@@ -130,45 +203,48 @@ class TestForkDetectEndToEnd:
         query = "authentication bug fix"
 
         # Call the fork-detect tool
-        result = mcp_server.call_tool("fork-detect", {"query": query})
+        result = _fork_detect(mcp_server, query)
 
         # Verify search service was called with the query
-        mock_search_service.search.assert_called_once_with(query)
+        mock_search_service.search.assert_called_once()
+        assert mock_search_service.search.call_args.args[0] == query
 
         # Verify result contains formatted search results
         assert result is not None
         assert "session-123" in result
         assert "session-456" in result
         assert "session-789" in result
-        assert "87.6%" in result  # First result score
+        assert "(87%)" in result  # First result score
         assert "JWT authentication" in result
 
     def test_fork_detect_displays_results(self, mcp_server, mock_search_service):
         """Test that /fork-detect displays results in the correct format."""
         query = "API design patterns"
-        result = mcp_server.call_tool("fork-detect", {"query": query})
+        result = _fork_detect(mcp_server, query)
 
         # Verify result contains all required elements
-        assert "Session ID:" in result
+        assert "Session:" in result
         assert "Score:" in result
         assert "Project:" in result
-        assert "Created:" in result
-        assert "Messages:" in result
-        assert "Chunks:" in result
+        assert "Date:" in result
         assert "Tags:" in result
         assert "Preview:" in result
-
-        # Verify score breakdown is included
-        assert "Best Similarity:" in result
-        assert "Avg Similarity:" in result
-        assert "Chunk Ratio:" in result
-        assert "Recency:" in result
-        assert "Chain Quality:" in result
-        assert "Memory Boost:" in result
+        assert "Fork Commands (copy & paste):" in result
+
+        # Verify score breakdown is available for the chat option
+        details = SelectionUI().format_chat_option(mock_search_service.search.return_value[0])
+        assert "Messages:" in details
+        assert "Chunks:" in details
+        assert "Best Similarity:" in details
+        assert "Avg Similarity:" in details
+        assert "Chunk Ratio:" in details
+        assert "Recency:" in details
+        assert "Chain Quality:" in details
+        assert "Memory Boost:" in details
 
     def test_fork_detect_empty_query(self, mcp_server):
         """Test /fork-detect with an empty query."""
-        result = mcp_server.call_tool("fork-detect", {"query": ""})
+        result = _fork_detect(mcp_server, "")
 
         # Verify error message is returned
         assert "error" in result.lower() or "query" in result.lower()
@@ -179,7 +255,7 @@ class TestForkDetectEndToEnd:
         mock_search_service.search.return_value = []
 
         query = "nonexistent topic"
-        result = mcp_server.call_tool("fork-detect", {"query": query})
+        result = _fork_detect(mcp_server, query)
 
         # Verify helpful message is returned
         assert "no" in result.lower() or "found" in result.lower()
@@ -189,17 +265,14 @@ class TestForkDetectEndToEnd:
         # Create server without search service
         server = create_server(search_service=None)
 
-        result = server.call_tool("fork-detect", {"query": "test"})
+        result = _fork_detect(server, "test")
 
-        # Verify error message is returned
-        assert "error" in result.lower() or "not available" in result.lower()
+        # Verify the not-initialized message is returned
+        assert "not initialized" in result.lower()
 
-    def test_selection_ui_creates_five_options(self, mock_search_service):
+    def test_selection_ui_creates_five_options(self, selection_options):
         """Test that selection UI creates exactly 5 options."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
-        options = ui.create_options(results)
+        options = selection_options
 
         # Verify exactly 5 options: top 3 + 'None' + 'Type something'
         assert len(options) == 5
@@ -210,77 +283,38 @@ class TestForkDetectEndToEnd:
         assert options[2].session_id == "session-789"
 
         # Verify 'None - start fresh' option
-        assert options[3].label == "None - start fresh"
-        assert options[3].action == "start_fresh"
+        assert options[3].label == "❌ None of these - start fresh"
+        assert options[3].id == "none"
 
         # Verify 'Type something else' option
-        assert options[4].label == "Type something else"
-        assert options[4].action == "refine"
+        assert options[4].label == "🔍 Type something else"
+        assert options[4].id == "refine"
 
-    def test_selection_ui_marks_recommended(self, mock_search_service):
+    def test_selection_ui_marks_recommended(self, selection_options):
         """Test that highest-scoring result is marked as recommended."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
-        selection_prompt = ui.format_selection_prompt(results)
+        selection_prompt = SelectionUI().format_selection_prompt(selection_options, "test")
 
         # Verify first result is marked as recommended
-        assert "Recommended" in selection_prompt or "⭐" in selection_prompt
-
-    def test_selection_ui_handles_fork_action(self, mock_search_service):
-        """Test selecting a result and handling fork action."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
-        # Simulate user selecting first option
-        action, data = ui.handle_selection(0, results)
-
-        # Verify fork action is returned
-        assert action == "fork"
-        assert data["session_id"] == "session-123"
-
-    def test_selection_ui_handles_start_fresh_action(self, mock_search_service):
-        """Test selecting 'None - start fresh' option."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
-        # Simulate user selecting 'None - start fresh' (index 3)
-        action, data = ui.handle_selection(3, results)
-
-        # Verify start_fresh action is returned
-        assert action == "start_fresh"
-        assert data == {}
-
-    def test_selection_ui_handles_refine_action(self, mock_search_service):
-        """Test selecting 'Type something else' option."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
-        # Simulate user selecting 'Type something else' (index 4)
-        action, data = ui.handle_selection(4, results)
-
-        # Verify refine action is returned
-        assert action == "refine"
-        assert data == {}
-
-    def test_fork_generator_creates_commands(self, temp_storage):
+        assert "⭐ [RECOMMENDED]" in selection_prompt
+
+    @pytest.mark.parametrize("option_id,expected_action,expected_session_id", [
+        ("result_0", "fork", "session-123"),  # First result
+        ("none", "start_fresh", None),  # 'None - start fresh'
+        ("refine", "refine", None),  # 'Type something else'
+    ])
+    def test_selection_ui_handles_action(
+        self, selection_options, option_id, expected_action, expected_session_id
+    ):
+        """Test that each selection option maps to the expected action."""
+        selection = SelectionUI().handle_selection(option_id, selection_options)
+
+        assert selection["status"] == "selected"
+        assert selection["action"] == expected_action
+        assert selection.get("session_id") == expected_session_id
+
+    def test_fork_generator_creates_commands(self, fork_setup):
         """Test that fork generator creates both terminal and in-session commands."""
-        generator = ForkGenerator(
-            claude_sessions_dir=temp_storage,
-            registry=Mock(spec=SessionRegistry)
-        )
-
-        session_id = "session-123"
-        metadata = {
-            "project": "my-project",
-            "created_at": datetime.now().isoformat(),
-            "message_count": 45,
-            "chunk_count": 12
-        }
-
-        # Create a dummy session file
-        session_file = Path(temp_storage) / f"{session_id}.jsonl"
-        session_file.write_text('{"role": "user", "content": "test"}\n')
+        generator, session_id, metadata = fork_setup
 
         # Generate fork command
         fork_cmd = generator.generate_fork_command(session_id, metadata)
@@ -291,47 +325,29 @@ class TestForkDetectEndToEnd:
         assert f"--resume {session_id}" in fork_cmd.terminal_command
         assert f"/fork {session_id}" in fork_cmd.in_session_command
 
-    def test_fork_generator_formats_output(self, temp_storage):
+    def test_fork_generator_formats_output(self, fork_setup):
         """Test that fork generator formats output for display."""
-        generator = ForkGenerator(
-            claude_sessions_dir=temp_storage,
-            registry=Mock(spec=SessionRegistry)
-        )
-
-        session_id = "session-123"
-        metadata = {
-            "project": "my-project",
-            "created_at": datetime.now().isoformat(),
-            "message_count": 45,
-            "chunk_count": 12
-        }
-
-        # Create a dummy session file
-        session_file = Path(temp_storage) / f"{session_id}.jsonl"
-        session_file.write_text('{"role": "user", "content": "test"}\n')
+        generator, session_id, metadata = fork_setup
 
         # Generate and format
         output = generator.generate_and_format(session_id, metadata)
 
         # Verify output contains metadata
-        assert "Session ID:" in output
-        assert session_id in output
+        assert f"Fork Command Generated: {session_id}" in output
+        assert "Session Details:" in output
         assert "my-project" in output
 
         # Verify output contains commands
-        assert "New Terminal:" in output or "Terminal Command:" in output
-        assert "In-Session:" in output or "In-Session Command:" in output
+        assert "Option 1: New Terminal Fork" in output
+        assert "Option 2: In-Session Fork" in output
 
-    def test_error_handling_invalid_selection(self, mock_search_service):
+    def test_error_handling_invalid_selection(self, selection_options):
         """Test error handling for invalid selection index."""
-        results = mock_search_service.search("test")
-        ui = SelectionUI()
-
         # Simulate invalid selection
-        action, data = ui.handle_selection(10, results)  # Out of range
+        selection = SelectionUI().handle_selection("result_10", selection_options)
 
-        # Verify error action is returned
-        assert action == "error"
+        # Verify error status is returned
+        assert selection["status"] == "error"
 
     def test_error_handling_search_exception(self):
         """Test error handling when search raises an exception."""
@@ -340,17 +356,17 @@ class TestForkDetectEndToEnd:
         service.search.side_effect = Exception("Search failed")
 
         server = create_server(search_service=service)
-        result = server.call_tool("fork-detect", {"query": "test"})
+        result = _fork_detect(server, "test")
 
         # Verify error is handled gracefully
         assert result is not None
         assert "error" in result.lower() or "failed" in result.lower()
 
-    def test_complete_workflow_fork_session(self, mcp_server, mock_search_service, temp_storage):
+    def test_complete_workflow_fork_session(self, mcp_server, mock_search_service, fork_setup):
         """Test the complete workflow: query -> results -> selection -> fork command."""
         # Step 1: User invokes /fork-detect with query
         query = "authentication bug fix"
-        search_result = mcp_server.call_tool("fork-detect", {"query": query})
+        search_result = _fork_detect(mcp_server, query)
 
         # Verify search was performed
         mock_search_service.search.assert_called_once()
@@ -359,21 +375,14 @@ class TestForkDetectEndToEnd:
         # Step 2: User sees results and makes a selection
         results = mock_search_service.search.return_value
         ui = SelectionUI()
-        action, data = ui.handle_selection(0, results)  # Select first result
+        data = ui.handle_selection("result_0", ui.create_options(results, query))
 
         # Verify fork action
-        assert action == "fork"
+        assert data["action"] == "fork"
         assert data["session_id"] == "session-123"
 
         # Step 3: Generate fork command
-        generator = ForkGenerator(
-            claude_sessions_dir=temp_storage,
-            registry=Mock(spec=SessionRegistry)
-        )
-
-        # Create a dummy session file
-        session_file = Path(temp_storage) / f"{data['session_id']}.jsonl"
-        session_file.write_text('{"role": "user", "content": "test"}\n')
+        generator, _, _ = fork_setup
 
         fork_cmd = generator.generate_fork_command(
             data["session_id"],
@@ -389,35 +398,35 @@ class TestForkDetectEndToEnd:
         """Test the complete workflow: query -> results -> start fresh."""
         # Step 1: User invokes /fork-detect with query
         query = "new feature"
-        mcp_server.call_tool("fork-detect", {"query": query})
+        _fork_detect(mcp_server, query)
 
         # Step 2: User decides to start fresh instead
         results = mock_search_service.search.return_value
         ui = SelectionUI()
-        action, data = ui.handle_selection(3, results)  # Select 'None - start fresh'
+        data = ui.handle_selection("none", ui.create_options(results, query))
 
         # Verify start_fresh action
-        assert action == "start_fresh"
-        assert data == {}
+        assert data["action"] == "start_fresh"
+        assert "session_id" not in data
 
     def test_complete_workflow_refine_search(self, mcp_server, mock_search_service):
         """Test the complete workflow: query -> results -> refine search."""
         # Step 1: User invokes /fork-detect with query
         query = "database optimization"
-        mcp_server.call_tool("fork-detect", {"query": query})
+        _fork_detect(mcp_server, query)
 
         # Step 2: User decides to refine search
         results = mock_search_service.search.return_value
         ui = SelectionUI()
-        action, data = ui.handle_selection(4, results)  # Select 'Type something else'
+        data = ui.handle_selection("refine", ui.create_options(results, query))
 
         # Verify refine action
-        assert action == "refine"
-        assert data == {}
+        assert data["action"] == "refine"
+        assert "session_id" not in data
 
         # Step 3: User provides new query
         refined_query = "PostgreSQL query performance"
-        mcp_server.call_tool("fork-detect", {"query": refined_query})
+        _fork_detect(mcp_server, refined_query)
 
         # Verify search was called again
         assert mock_search_service.search.call_count == 2
@@ -435,7 +444,7 @@ class TestForkDetectEdgeCases:
 
         # Create a very long query (1000+ characters)
         long_query = "authentication " * 100
-        result = server.call_tool("fork-detect", {"query": long_query})
+        result = _fork_detect(server, long_query)
 
         # Verify query is handled without errors
         assert result is not None
@@ -450,7 +459,7 @@ class TestForkDetectEdgeCases:
 
         # Query with special characters
         query = "API @authentication #bug-fix $config <test> & validation"
-        result = server.call_tool("fork-detect", {"query": query})
+        result = _fork_detect(server, query)
 
         # Verify query is handled without errors
         assert result is not None
@@ -465,7 +474,7 @@ class TestForkDetectEdgeCases:
 
         # Query with unicode characters
         query = "データベース optimization 🚀 émoji test"
-        result = server.call_tool("fork-detect", {"query": query})
+        result = _fork_detect(server, query)
 
         # Verify query is handled without errors
         assert result is not None
@@ -473,14 +482,11 @@ class TestForkDetectEdgeCases:
 
     def test_session_file_not_found(self, tmp_path):
         """Test fork generator when session file doesn't exist."""
-        generator = ForkGenerator(
-            claude_sessions_dir=str(tmp_path),
-            registry=Mock(spec=SessionRegistry)
-        )
+        generator = ForkGenerator(claude_sessions_dir=str(tmp_path))
 
         # Try to generate command for non-existent session
         session_id = "nonexistent-session"
-        metadata = {"project": "test"}
+        metadata = SessionMetadata(session_id=session_id, project="test")
 
         fork_cmd = generator.generate_fork_command(session_id, metadata)
 
@@ -493,75 +499,55 @@ class TestForkDetectEdgeCases:
         ui = SelectionUI()
         results = []
 
-        options = ui.create_options(results)
+        options = ui.create_options(results, "test")
 
-        # Verify still creates 5 options (0 results + None + Type something + 2 placeholders)
+        # Verify still creates 5 options (None + Type something + 3 placeholders)
         assert len(options) == 5
 
-        # Verify last two are always None and Type something
-        assert options[3].action == "start_fresh"
-        assert options[4].action == "refine"
+        # Verify None and Type something come before the placeholders
+        assert options[0].id == "none"
+        assert options[1].id == "refine"
+        assert all(option.session_id is None for option in options)
 
     def test_selection_with_single_result(self):
         """Test selection UI with only one search result."""
         ui = SelectionUI()
-        results = [
-            SessionSearchResult(
-                session_id="session-only",
-                score=SessionScore(
-                    session_id="session-only",
-                    best_similarity=0.9,
-                    avg_similarity=0.8,
-                    chunk_ratio=0.7,
-                    recency_score=0.95,
-                    chain_quality=0.5,
-                    memory_boost=0.0,
-                    final_score=0.85,
-                    num_chunks_matched=2
-                ),
-                metadata={
-                    "project": "test",
-                    "created_at": datetime.now().isoformat(),
-                    "message_count": 10,
-                    "chunk_count": 3,
-                    "tags": []
-                },
-                preview="Only result",
-                matched_chunks=[]
-            )
-        ]
+        results = [_SINGLE_RESULT]
 
-        options = ui.create_options(results)
+        options = ui.create_options(results, "test")
 
-        # Verify creates 5 options (1 result + 2 placeholders + None + Type something)
+        # Verify creates 5 options (1 result + None + Type something + 2 placeholders)
         assert len(options) == 5
         assert options[0].session_id == "session-only"
 
 
 class TestForkDetectIntegration:
-    """Integration tests with real components (mocked external dependencies only)."""
+    """
+    Integration tests with real components (mocked external dependencies only).
 
-    @pytest.fixture
-    def integration_storage(self):
-        """Create temporary storage for integration tests."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield tmpdir
+    Each test gets its own ``tmp_path`` storage and shares no state, so the
+    class is safe to distribute with pytest-xdist (``pytest -n auto``).
+    """
 
     @pytest.fixture
     def mock_embedding_service(self):
         """Create a mock embedding service."""
         service = Mock(spec=EmbeddingService)
         # Return a realistic 384-dimensional embedding
-        service.embed_single.return_value = [0.1] * 384
-        service.embed_texts.return_value = [[0.1] * 384]
+        service.embed_single.return_value = _EMBED
+        service.embed_texts.return_value = _EMBED_BATCH
         return service
 
-    def test_integration_with_real_components(self, integration_storage, mock_embedding_service):
+    def test_integration_with_real_components(self, tmp_path, mock_embedding_service):
         """Test integration with real SearchService, ScoringService, etc."""
+        # Only this test needs the real storage-backed services
+        from smart_fork.vector_db_service import VectorDBService
+        from smart_fork.scoring_service import ScoringService
+
         # Create real components with mocked embedding
-        vector_db = VectorDBService(storage_dir=integration_storage)
+        vector_db = VectorDBService(persist_directory=str(tmp_path / "vector_db"))
         scoring = ScoringService()
-        registry = SessionRegistry(storage_dir=integration_storage)
+        registry = SessionRegistry(registry_path=str(tmp_path / "session-registry.json"))
 
         # Create search service with real components
         search_service = SearchService(
@@ -575,7 +561,7 @@ class TestForkDetectIntegration:
         server = create_server(search_service=search_service)
 
         # Invoke /fork-detect
-        result = server.call_tool("fork-detect", {"query": "test query"})
+        result = _fork_detect(server, "test query")
 
         # Verify result is returned (even if empty)
         assert result is not None
@@ -587,7 +573,7 @@ def test_fork_detect_tool_registered():
     server = create_server(search_service=None)
 
     # Verify tool is registered
-    tools = server.list_tools()
+    tools = {tool["name"]: tool for tool in server.handle_tools_list({})["tools"]}
     assert "fork-detect" in tools
 
     # Verify tool has correct schema
@@ -598,11 +584,11 @@ def test_fork_detect_tool_registered():
 def test_fork_detect_tool_schema():
     """Test that /fork-detect tool has correct input schema."""
     server = create_server(search_service=None)
-    tools = server.list_tools()
+    tools = {tool["name"]: tool for tool in server.handle_tools_list({})["tools"]}
 
-    tool_info = tools["fork-detect"]
+    schema = tools["fork-detect"]["inputSchema"]
 
     # Verify schema includes query parameter
-    assert "query" in str(tool_info)
+    assert schema["properties"]["query"]["type"] == "string"
     # Verify query is required
-    assert "string" in str(tool_info).lower()
+    assert "query" in schema["required"]
@@ -5,12 +5,12 @@ Tests for fork command generator.
 import unittest
 import os
 import tempfile
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from unittest.mock import patch
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from smart_fork import fork_generator
 from smart_fork.fork_generator import ForkGenerator, ForkCommand
 from smart_fork.session_registry import SessionMetadata
 
@@ -64,6 +64,20 @@ class TestForkGeneratorInit(unittest.TestCase):
 
         self.assertEqual(generator.claude_sessions_dir, custom_dir)
 
+    def test_session_paths_match_os_path_join(self):
+        """Test that session paths match os.path.join for edge-case directories."""
+        for sessions_dir in ("/custom/sessions/", "/custom/sessions", "/", ""):
+            with self.subTest(sessions_dir=sessions_dir):
+                generator = ForkGenerator(claude_sessions_dir=sessions_dir)
+                self.assertEqual(
+                    generator.find_session_path("abc"),
+                    os.path.join(sessions_dir, "abc.jsonl")
+                )
+                self.assertEqual(
+                    generator.find_session_path("abc", project="proj"),
+                    os.path.join(sessions_dir, "projects", "proj", "abc.jsonl")
+                )
+
     def test_init_expands_home(self):
         """Test that ~ is expanded in sessions directory."""
         generator = ForkGenerator(claude_sessions_dir="~/custom/claude")
@@ -76,10 +90,24 @@ class TestForkGeneratorInit(unittest.TestCase):
 class TestFindSessionPath(unittest.TestCase):
     """Test session path finding."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.generator = ForkGenerator(claude_sessions_dir=self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one generator and temp directory shared by all tests."""
+        cls._tmp = tempfile.TemporaryDirectory(prefix="sf_")
+        cls.temp_dir = cls._tmp.name
+        cls.generator = ForkGenerator(claude_sessions_dir=cls.temp_dir)
+
+        # Create the project and sessions subdirectories once for the class
+        cls.project = "my-project"
+        cls.project_dir = os.path.join(cls.temp_dir, "projects", cls.project)
+        cls.sessions_subdir = os.path.join(cls.temp_dir, "sessions")
+        os.makedirs(cls.project_dir)
+        os.makedirs(cls.sessions_subdir)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared temp directory."""
+        cls._tmp.cleanup()
 
     def test_find_session_direct_path(self):
         """Test finding session in direct path."""
@@ -97,13 +125,9 @@ class TestFindSessionPath(unittest.TestCase):
     def test_find_session_project_path(self):
         """Test finding session in project subdirectory."""
         session_id = "test-session-456"
-        project = "my-project"
+        project = self.project
 
-        # Create project directory structure
-        project_dir = os.path.join(self.temp_dir, "projects", project)
-        os.makedirs(project_dir, exist_ok=True)
-
-        session_file = os.path.join(project_dir, f"{session_id}.jsonl")
+        session_file = os.path.join(self.project_dir, f"{session_id}.jsonl")
         with open(session_file, 'w') as f:
             f.write('{"test": "data"}\n')
 
@@ -115,11 +139,7 @@ class TestFindSessionPath(unittest.TestCase):
         """Test finding session in sessions subdirectory."""
         session_id = "test-session-789"
 
-        # Create sessions subdirectory
-        sessions_dir = os.path.join(self.temp_dir, "sessions")
-        os.makedirs(sessions_dir, exist_ok=True)
-
-        session_file = os.path.join(sessions_dir, f"{session_id}.jsonl")
+        session_file = os.path.join(self.sessions_subdir, f"{session_id}.jsonl")
         with open(session_file, 'w') as f:
             f.write('{"test": "data"}\n')
 
@@ -127,6 +147,83 @@ class TestFindSessionPath(unittest.TestCase):
         self.assertEqual(path, session_file)
         self.assertTrue(os.path.exists(path))
 
+    def test_find_session_ignores_directories(self):
+        """Test that a directory named like a session file is not matched."""
+        session_id = "test-session-dir"
+        os.makedirs(os.path.join(self.temp_dir, f"{session_id}.jsonl"))
+
+        session_file = os.path.join(self.sessions_subdir, f"{session_id}.jsonl")
+        with open(session_file, 'w') as f:
+            f.write('{"test": "data"}\n')
+
+        path = self.generator.find_session_path(session_id)
+        self.assertEqual(path, session_file)
+
+    def test_find_session_caches_found_path(self):
+        """Test that a found session path is served from the cache."""
+        session_id = "test-session-cached"
+        session_file = os.path.join(self.temp_dir, f"{session_id}.jsonl")
+
+        with open(session_file, 'w') as f:
+            f.write('{"test": "data"}\n')
+
+        path = self.generator.find_session_path(session_id)
+        self.assertEqual(path, session_file)
+
+        with patch('smart_fork.fork_generator._try_stat',
+                   wraps=fork_generator._try_stat) as mock_stat:
+            cached = self.generator.find_session_path(session_id)
+
+        # Only the cached path is re-checked
+        mock_stat.assert_called_once_with(session_file)
+        self.assertEqual(cached, session_file)
+
+    def test_find_session_cached_path_moved(self):
+        """Test that a cached path is re-probed once the file has moved."""
+        session_id = "test-session-archived"
+        session_file = os.path.join(self.temp_dir, f"{session_id}.jsonl")
+
+        with open(session_file, 'w') as f:
+            f.write('{"test": "data"}\n')
+
+        self.assertEqual(self.generator.find_session_path(session_id), session_file)
+
+        moved_file = os.path.join(self.sessions_subdir, f"{session_id}.jsonl")
+        os.rename(session_file, moved_file)
+
+        self.assertEqual(self.generator.find_session_path(session_id), moved_file)
+
+    def test_path_cache_is_bounded(self):
+        """Test that the path cache evicts the least recently used entry."""
+        generator = ForkGenerator(claude_sessions_dir=self.temp_dir)
+        session_file = os.path.join(self.temp_dir, "test-session-bounded.jsonl")
+        with open(session_file, 'w') as f:
+            f.write('{"test": "data"}\n')
+
+        with patch.object(fork_generator, '_PATH_CACHE_SIZE', 2):
+            for project in ("a", "b", "c"):
+                generator.find_session_path("test-session-bounded", project=project)
+
+        self.assertEqual(
+            list(generator._path_cache),
+            [("test-session-bounded", "b"), ("test-session-bounded", "c")]
+        )
+
+    def test_find_session_miss_not_cached(self):
+        """Test that a session created after a miss is found on the next lookup."""
+        session_id = "test-session-late"
+
+        likely_path = self.generator.find_session_path(session_id)
+        self.assertNotIn((session_id, None), self.generator._path_cache)
+
+        # File appears later in the sessions subdirectory
+        session_file = os.path.join(self.sessions_subdir, f"{session_id}.jsonl")
+        with open(session_file, 'w') as f:
+            f.write('{"test": "data"}\n')
+
+        self.assertNotEqual(likely_path, session_file)
+        self.assertEqual(self.generator.find_session_path(session_id), session_file)
+
     def test_find_session_not_found_returns_likely_path(self):
         """Test that when session not found, returns likely path."""
         session_id = "nonexistent-session"
@@ -208,12 +305,14 @@ class TestFormatMetadata(unittest.TestCase):
 
         formatted = self.generator.format_metadata(metadata)
 
-        self.assertIn("test-project", formatted)
-        self.assertIn("2026-01-20", formatted)
-        self.assertIn("42", formatted)
-        self.assertIn("15", formatted)
-        self.assertIn("important", formatted)
-        self.assertIn("feature-x", formatted)
+        expected = (
+            "Project: test-project\n"
+            "Created: 2026-01-20 15:30\n"
+            "Messages: 42\n"
+            "Chunks: 15\n"
+            "Tags: important, feature-x"
+        )
+        self.assertEqual(formatted, expected)
 
     def test_format_metadata_minimal(self):
         """Test formatting minimal metadata."""
@@ -233,6 +332,25 @@ class TestFormatMetadata(unittest.TestCase):
         self.assertIn("10", formatted)
         self.assertIn("3", formatted)
 
+    def test_format_metadata_cached_by_content(self):
+        """Test that equal metadata reuses the cached string and changes are reflected."""
+        metadata = SessionMetadata(
+            session_id="test-cache",
+            project="test-project",
+            created_at="2026-01-20T15:30:00Z",
+            message_count=7,
+            chunk_count=2,
+            tags=["cached"]
+        )
+
+        first = self.generator.format_metadata(metadata)
+        second = self.generator.format_metadata(metadata)
+        self.assertIs(first, second)
+
+        metadata.message_count = 8
+        updated = self.generator.format_metadata(metadata)
+        self.assertIn("Messages: 8", updated)
+
     def test_format_metadata_none(self):
         """Test formatting None metadata."""
         formatted = self.generator.format_metadata(None)
@@ -260,10 +378,22 @@ class TestFormatMetadata(unittest.TestCase):
 class TestGenerateForkCommand(unittest.TestCase):
     """Test full fork command generation."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.generator = ForkGenerator(claude_sessions_dir=self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one generator and temp directory shared by all tests."""
+        cls._tmp = tempfile.TemporaryDirectory(prefix="sf_")
+        cls.temp_dir = cls._tmp.name
+        cls.generator = ForkGenerator(claude_sessions_dir=cls.temp_dir)
+
+        # Create the project directory once for the class
+        cls.project = "test-project"
+        cls.project_dir = os.path.join(cls.temp_dir, "projects", cls.project)
+        os.makedirs(cls.project_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared temp directory."""
+        cls._tmp.cleanup()
 
     def test_generate_fork_command_basic(self):
         """Test generating fork command without metadata."""
@@ -302,13 +432,9 @@ class TestGenerateForkCommand(unittest.TestCase):
     def test_generate_fork_command_uses_project_path(self):
         """Test that fork command uses project when finding path."""
         session_id = "test-session-789"
-        project = "test-project"
+        project = self.project
 
-        # Create project directory structure
-        project_dir = os.path.join(self.temp_dir, "projects", project)
-        os.makedirs(project_dir, exist_ok=True)
-
-        session_file = os.path.join(project_dir, f"{session_id}.jsonl")
+        session_file = os.path.join(self.project_dir, f"{session_id}.jsonl")
         with open(session_file, 'w') as f:
             f.write('{"test": "data"}\n')
 
@@ -328,6 +454,18 @@ class TestGenerateForkCommand(unittest.TestCase):
         self.assertEqual(fork_cmd.session_path, session_file)
         self.assertTrue(os.path.exists(fork_cmd.session_path))
 
+    def test_generate_fork_command_with_resolved_path(self):
+        """Test that a pre-resolved session path skips the lookup."""
+        session_id = "test-session-resolved"
+        session_path = "/resolved/path/test-session-resolved.jsonl"
+
+        with patch.object(self.generator, 'find_session_path') as mock_find:
+            fork_cmd = self.generator.generate_fork_command(session_id, session_path=session_path)
+            mock_find.assert_not_called()
+
+        self.assertEqual(fork_cmd.session_path, session_path)
+        self.assertEqual(fork_cmd.in_session_command, f"/fork {session_id} {session_path}")
+
 
 class TestFormatForkOutput(unittest.TestCase):
     """Test fork command output formatting."""
@@ -347,11 +485,23 @@ class TestFormatForkOutput(unittest.TestCase):
 
         output = self.generator.format_fork_output(fork_cmd)
 
-        self.assertIn("test-123", output)
-        self.assertIn("claude --resume test-123 --fork-session", output)
-        self.assertIn("/fork test-123 /path/to/session.jsonl", output)
-        self.assertIn("Option 1: New Terminal Fork", output)
-        self.assertIn("Option 2: In-Session Fork", output)
+        expected = "\n".join([
+            "=" * 80,
+            "Fork Command Generated: test-123",
+            "=" * 80,
+            "",
+            "Fork Commands:",
+            "-" * 80,
+            "",
+            "Option 1: New Terminal Fork",
+            "  claude --resume test-123 --fork-session",
+            "",
+            "Option 2: In-Session Fork",
+            "  /fork test-123 /path/to/session.jsonl",
+            "",
+            "=" * 80,
+        ])
+        self.assertEqual(output, expected)
 
     def test_format_fork_output_with_metadata(self):
         """Test formatting fork output with metadata."""
@@ -376,40 +526,40 @@ class TestFormatForkOutput(unittest.TestCase):
         self.assertIn("30", output)
         self.assertIn("12", output)
 
-    def test_format_fork_output_with_execution_time(self):
-        """Test formatting fork output with execution time."""
+    def test_format_fork_output_execution_times(self):
+        """Test formatting fork output with short and long execution times."""
         fork_cmd = ForkCommand(
             session_id="test-789",
             terminal_command="claude --resume test-789 --fork-session",
             in_session_command="/fork test-789 /path.jsonl"
         )
 
-        output = self.generator.format_fork_output(fork_cmd, execution_time=5.5)
-
-        self.assertIn("✨", output)
-        self.assertIn("6s", output)  # 5.5 rounds to 6
-
-    def test_format_fork_output_with_long_execution_time(self):
-        """Test formatting fork output with long execution time."""
-        fork_cmd = ForkCommand(
-            session_id="test-999",
-            terminal_command="claude --resume test-999 --fork-session",
-            in_session_command="/fork test-999 /path.jsonl"
-        )
-
-        output = self.generator.format_fork_output(fork_cmd, execution_time=73.0)
-
-        self.assertIn("✨", output)
-        self.assertIn("1m 13s", output)
+        cases = [
+            (5.5, "✨ Generated in 6s"),  # 5.5 rounds to 6
+            (0.4, "✨ Generated in 0s"),
+            (73.0, "✨ Generated in 1m 13s"),
+            (3600.0, "✨ Generated in 60m 0s"),
+        ]
+        for execution_time, expected in cases:
+            with self.subTest(execution_time=execution_time):
+                output = self.generator.format_fork_output(fork_cmd, execution_time=execution_time)
+                self.assertTrue(output.endswith(expected))
 
 
 class TestGenerateAndFormat(unittest.TestCase):
     """Test combined generation and formatting."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.generator = ForkGenerator(claude_sessions_dir=self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one generator and temp directory shared by all tests."""
+        cls._tmp = tempfile.TemporaryDirectory(prefix="sf_")
+        cls.temp_dir = cls._tmp.name
+        cls.generator = ForkGenerator(claude_sessions_dir=cls.temp_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared temp directory."""
+        cls._tmp.cleanup()
 
     def test_generate_and_format_complete(self):
         """Test generating and formatting in one step."""
@@ -4,9 +4,9 @@ Unit tests for InitialSetup class.
 
 import pytest
 import json
-import time
 from pathlib import Path
-from unittest.mock import Mock, MagicMock, patch, call
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, call
 from datetime import datetime
 
 from smart_fork.initial_setup import (
@@ -15,140 +15,165 @@ from smart_fork.initial_setup import (
     SetupState
 )
 
+_STARTED = 1_700_000_000.0
+
+# Read-only stand-ins for parser/chunker output; SimpleNamespace is enough
+# where no call tracking is needed
+_FAKE_EMBEDDING = [0.1] * 384
+_FAKE_CHUNK = SimpleNamespace(
+    content="test chunk",
+    start_index=0,
+    end_index=1,
+    message_indices=[0],
+    memory_types=[]
+)
+_FAKE_SESSION_DATA = SimpleNamespace(
+    messages=[SimpleNamespace(timestamp="2024-01-01T00:00:00Z", content="test")]
+)
 
-class TestSetupProgress:
-    """Tests for SetupProgress dataclass."""
-
-    def test_setup_progress_creation(self):
-        """Test creating a SetupProgress instance."""
-        progress = SetupProgress(
-            total_files=100,
-            processed_files=50,
-            current_file="session_123.jsonl",
-            total_chunks=1000,
-            elapsed_time=120.0,
-            estimated_remaining=120.0
-        )
 
-        assert progress.total_files == 100
-        assert progress.processed_files == 50
-        assert progress.current_file == "session_123.jsonl"
-        assert progress.total_chunks == 1000
-        assert progress.elapsed_time == 120.0
-        assert progress.estimated_remaining == 120.0
-        assert progress.is_complete is False
-        assert progress.error is None
-
-    def test_setup_progress_complete(self):
-        """Test SetupProgress with is_complete flag."""
-        progress = SetupProgress(
-            total_files=100,
-            processed_files=100,
-            current_file="",
-            total_chunks=2000,
-            elapsed_time=300.0,
-            estimated_remaining=0.0,
-            is_complete=True
-        )
+@pytest.fixture(scope="session")
+def claude_tree(tmp_path_factory):
+    """
+    Read-only Claude directory shared by tests that only scan it.
+
+    Contains three valid sessions (one nested under projects/), one file
+    too small to count and one non-JSONL file.
+    """
+    root = tmp_path_factory.mktemp("claude")
+    (root / "session1.jsonl").write_bytes(b"x" * 200)
+    (root / "session2.jsonl").write_bytes(b"x" * 200)
+    (root / "small.jsonl").write_bytes(b"x")
+    (root / "other.txt").write_bytes(b"x" * 200)
+    project_dir = root / "projects" / "myproject"
+    project_dir.mkdir(parents=True)
+    (project_dir / "session3.jsonl").write_bytes(b"x" * 200)
+    return root
+
+
+@pytest.fixture
+def isolated_home(monkeypatch, tmp_path):
+    """Point HOME at a per-test directory so default paths never hit the real home."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """
+    Freeze time.time() as seen by smart_fork.initial_setup.
+
+    Returns a one-element list holding the current time; tests advance the
+    clock by adding to ``frozen_time[0]``.
+    """
+    now = [_STARTED]
+    monkeypatch.setattr("smart_fork.initial_setup.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(scope="module")
+def stateless_setup():
+    """Shared InitialSetup for tests of pure helper methods."""
+    return InitialSetup(show_progress=False)
+
+
+_BASE_PROGRESS = dict(
+    total_files=100,
+    processed_files=50,
+    current_file="session_123.jsonl",
+    total_chunks=1000,
+    elapsed_time=120.0,
+    estimated_remaining=120.0
+)
 
-        assert progress.is_complete is True
 
-    def test_setup_progress_with_error(self):
-        """Test SetupProgress with error."""
-        progress = SetupProgress(
-            total_files=100,
-            processed_files=50,
-            current_file="session_bad.jsonl",
-            total_chunks=1000,
-            elapsed_time=120.0,
-            estimated_remaining=120.0,
-            error="Failed to parse session"
-        )
+class TestSetupProgress:
+    """Tests for SetupProgress dataclass."""
 
-        assert progress.error == "Failed to parse session"
+    @pytest.mark.parametrize("kwargs,expected_complete,expected_error", [
+        (_BASE_PROGRESS, False, None),
+        (
+            dict(_BASE_PROGRESS, processed_files=100, current_file="", total_chunks=2000,
+                 elapsed_time=300.0, estimated_remaining=0.0, is_complete=True),
+            True,
+            None
+        ),
+        (
+            dict(_BASE_PROGRESS, current_file="session_bad.jsonl", error="Failed to parse session"),
+            False,
+            "Failed to parse session"
+        ),
+    ])
+    def test_setup_progress(self, kwargs, expected_complete, expected_error):
+        """Test creating SetupProgress instances."""
+        progress = SetupProgress(**kwargs)
+
+        assert progress.total_files == kwargs['total_files']
+        assert progress.processed_files == kwargs['processed_files']
+        assert progress.current_file == kwargs['current_file']
+        assert progress.total_chunks == kwargs['total_chunks']
+        assert progress.elapsed_time == kwargs['elapsed_time']
+        assert progress.estimated_remaining == kwargs['estimated_remaining']
+        assert progress.is_complete is expected_complete
+        assert progress.error == expected_error
 
 
 class TestSetupState:
     """Tests for SetupState dataclass."""
 
-    def test_setup_state_creation(self):
-        """Test creating a SetupState instance."""
-        state = SetupState(
-            total_files=100,
-            processed_files=["file1.jsonl", "file2.jsonl"],
-            timed_out_files=[],
-            started_at=time.time(),
-            last_updated=time.time()
-        )
-
-        assert state.total_files == 100
-        assert len(state.processed_files) == 2
-        assert "file1.jsonl" in state.processed_files
-        assert state.timed_out_files == []
-
-    def test_setup_state_to_dict(self):
-        """Test converting SetupState to dictionary."""
-        started = time.time()
-        state = SetupState(
-            total_files=50,
-            processed_files=["file1.jsonl"],
-            timed_out_files=["file2.jsonl"],
-            started_at=started,
-            last_updated=started
-        )
-
-        data = state.to_dict()
-        assert data['total_files'] == 50
-        assert data['processed_files'] == ["file1.jsonl"]
-        assert data['timed_out_files'] == ["file2.jsonl"]
-        assert data['started_at'] == started
-        assert data['last_updated'] == started
-
-    def test_setup_state_from_dict(self):
-        """Test creating SetupState from dictionary."""
-        started = time.time()
-        data = {
+    @pytest.mark.parametrize("data", [
+        {
+            'total_files': 100,
+            'processed_files': ["file1.jsonl", "file2.jsonl"],
+            'timed_out_files': [],
+            'started_at': _STARTED,
+            'last_updated': _STARTED
+        },
+        {
+            'total_files': 50,
+            'processed_files': ["file1.jsonl"],
+            'timed_out_files': ["file2.jsonl"],
+            'started_at': _STARTED,
+            'last_updated': _STARTED
+        },
+        # Old state files have no timed_out_files
+        {
             'total_files': 75,
             'processed_files': ["file1.jsonl", "file2.jsonl"],
-            'started_at': started,
-            'last_updated': started
-        }
-
-        state = SetupState.from_dict(data)
-        assert state.total_files == 75
-        assert len(state.processed_files) == 2
-        assert state.started_at == started
-
-    def test_setup_state_roundtrip(self):
-        """Test SetupState serialization round-trip."""
-        started = time.time()
-        original = SetupState(
-            total_files=100,
-            processed_files=["a.jsonl", "b.jsonl", "c.jsonl"],
-            timed_out_files=["d.jsonl"],
-            started_at=started,
-            last_updated=started + 10
-        )
-
-        data = original.to_dict()
-        restored = SetupState.from_dict(data)
-
-        assert restored.total_files == original.total_files
-        assert restored.processed_files == original.processed_files
-        assert restored.timed_out_files == original.timed_out_files
-        assert restored.started_at == original.started_at
-        assert restored.last_updated == original.last_updated
+            'started_at': _STARTED,
+            'last_updated': _STARTED
+        },
+        {
+            'total_files': 100,
+            'processed_files': ["a.jsonl", "b.jsonl", "c.jsonl"],
+            'timed_out_files': ["d.jsonl"],
+            'started_at': _STARTED,
+            'last_updated': _STARTED + 10
+        },
+    ])
+    def test_setup_state_roundtrip(self, data):
+        """Test SetupState creation from a dict and serialization round-trip."""
+        state = SetupState.from_dict(dict(data))
+
+        assert state.total_files == data['total_files']
+        assert state.processed_files == data['processed_files']
+        assert state.timed_out_files == data.get('timed_out_files', [])
+        assert state.started_at == data['started_at']
+        assert state.last_updated == data['last_updated']
+
+        assert state.to_dict() == {'timed_out_files': [], **data}
+        assert SetupState.from_dict(state.to_dict()) == state
 
 
 class TestInitialSetupInit:
     """Tests for InitialSetup initialization."""
 
-    def test_init_default_paths(self):
+    def test_init_default_paths(self, isolated_home):
         """Test initialization with default paths."""
         setup = InitialSetup()
 
-        assert setup.storage_dir == Path("~/.smart-fork").expanduser()
-        assert setup.claude_dir == Path("~/.claude").expanduser()
+        assert setup.storage_dir == isolated_home / ".smart-fork"
+        assert setup.claude_dir == isolated_home / ".claude"
         # Default callback should be set when show_progress=True (default)
         assert setup.progress_callback is not None
 
@@ -173,7 +198,7 @@ class TestInitialSetupInit:
 
         assert setup.progress_callback is callback
 
-    def test_init_services_none(self):
+    def test_init_services_none(self, isolated_home):
         """Test that services are initially None."""
         setup = InitialSetup()
 
@@ -185,111 +210,72 @@ class TestInitialSetupInit:
 class TestInitialSetupFirstRun:
     """Tests for first-run detection."""
 
-    def test_is_first_run_when_dir_missing(self, tmp_path):
-        """Test is_first_run returns True when directory doesn't exist."""
-        storage_dir = tmp_path / "nonexistent"
-        setup = InitialSetup(storage_dir=str(storage_dir))
-
-        assert setup.is_first_run() is True
-
-    def test_is_first_run_when_dir_exists(self, tmp_path):
-        """Test is_first_run returns False when directory exists."""
-        storage_dir = tmp_path / "existing"
-        storage_dir.mkdir()
-        setup = InitialSetup(storage_dir=str(storage_dir))
-
-        assert setup.is_first_run() is False
-
-    def test_has_incomplete_setup_when_missing(self, tmp_path):
-        """Test has_incomplete_setup returns False when no state file."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
-        setup = InitialSetup(storage_dir=str(storage_dir))
-
-        assert setup.has_incomplete_setup() is False
+    @pytest.mark.parametrize(
+        "make_dir,make_state,want_first,want_incomplete",
+        [
+            (False, False, True, False),
+            (True, False, False, False),
+            (True, True, False, True),
+        ],
+        ids=["dir_missing", "dir_exists", "state_exists"]
+    )
+    def test_first_run_detection(
+        self, fs, make_dir, make_state, want_first, want_incomplete
+    ):
+        """Test is_first_run and has_incomplete_setup for each storage layout."""
+        if make_dir:
+            fs.create_dir("/storage")
+        if make_state:
+            fs.create_file("/storage/setup_state.json", contents="{}")
 
-    def test_has_incomplete_setup_when_exists(self, tmp_path):
-        """Test has_incomplete_setup returns True when state file exists."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
-        state_file = storage_dir / "setup_state.json"
-        state_file.write_text("{}")
+        setup = InitialSetup(storage_dir="/storage")
 
-        setup = InitialSetup(storage_dir=str(storage_dir))
-        assert setup.has_incomplete_setup() is True
+        assert setup.is_first_run() is want_first
+        assert setup.has_incomplete_setup() is want_incomplete
 
 
 class TestInitialSetupSessionFiles:
     """Tests for finding session files."""
 
-    def test_find_session_files_empty_dir(self, tmp_path):
+    def test_find_session_files_empty_dir(self, fs):
         """Test finding session files in empty directory."""
-        claude_dir = tmp_path / "claude"
-        claude_dir.mkdir()
+        fs.create_dir("/claude")
 
-        setup = InitialSetup(claude_dir=str(claude_dir))
+        setup = InitialSetup(claude_dir="/claude")
         files = setup._find_session_files()
 
         assert len(files) == 0
 
-    def test_find_session_files_nonexistent_dir(self, tmp_path):
+    def test_find_session_files_nonexistent_dir(self, fs):
         """Test finding session files when directory doesn't exist."""
-        claude_dir = tmp_path / "nonexistent"
-
-        setup = InitialSetup(claude_dir=str(claude_dir))
+        setup = InitialSetup(claude_dir="/nonexistent")
         files = setup._find_session_files()
 
         assert len(files) == 0
 
-    def test_find_session_files_with_sessions(self, tmp_path):
-        """Test finding session files."""
-        claude_dir = tmp_path / "claude"
-        claude_dir.mkdir()
-
-        # Create some session files
-        (claude_dir / "session1.jsonl").write_text("x" * 200)
-        (claude_dir / "session2.jsonl").write_text("x" * 200)
-
-        # Create a file that's too small (should be ignored)
-        (claude_dir / "small.jsonl").write_text("x")
-
-        # Create a non-jsonl file (should be ignored)
-        (claude_dir / "other.txt").write_text("x" * 200)
-
-        setup = InitialSetup(claude_dir=str(claude_dir))
-        files = setup._find_session_files()
-
-        assert len(files) == 2
-        assert all(f.suffix == ".jsonl" for f in files)
-
-    def test_find_session_files_recursive(self, tmp_path):
-        """Test finding session files recursively."""
-        claude_dir = tmp_path / "claude"
-        projects_dir = claude_dir / "projects" / "myproject"
-        projects_dir.mkdir(parents=True)
-
-        # Create sessions at different levels
-        (claude_dir / "session1.jsonl").write_text("x" * 200)
-        (projects_dir / "session2.jsonl").write_text("x" * 200)
-
-        setup = InitialSetup(claude_dir=str(claude_dir))
-        files = setup._find_session_files()
+    @pytest.mark.parametrize("check", [
+        # Small and non-JSONL files are skipped
+        lambda files: len(files) == 3,
+        lambda files: all(f.suffix == ".jsonl" for f in files),
+        # Sessions in nested project directories are found
+        lambda files: any("projects" in f.parts for f in files),
+    ], ids=["count", "suffix", "recursive"])
+    def test_find_session_files_invariants(self, claude_tree, check):
+        """Test session discovery against the shared Claude tree."""
+        setup = InitialSetup(claude_dir=str(claude_tree))
 
-        assert len(files) == 2
+        assert check(setup._find_session_files())
 
 
 class TestInitialSetupState:
     """Tests for state management."""
 
-    def test_save_and_load_state(self, tmp_path):
-        """Test saving and loading state."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
-
-        setup = InitialSetup(storage_dir=str(storage_dir))
+    def test_save_state_writes_json(self, fs, frozen_time):
+        """Test that saving state writes it to the state file as JSON."""
+        fs.create_dir("/storage")
+        setup = InitialSetup(storage_dir="/storage")
 
-        # Create state
-        started = time.time()
+        started = frozen_time[0]
         state = SetupState(
             total_files=100,
             processed_files=["file1.jsonl", "file2.jsonl"],
@@ -298,111 +284,95 @@ class TestInitialSetupState:
             last_updated=started + 10
         )
 
-        # Save state
         setup._save_state(state)
 
-        # Load state
+        data = json.loads(setup.state_file.read_text())
+        assert data['total_files'] == 100
+        assert data['timed_out_files'] == ["file3.jsonl"]
+
+    def test_load_state_reads_written(self, fs):
+        """Test loading state from an existing state file."""
+        fs.create_file("/storage/setup_state.json", contents=json.dumps({
+            'total_files': 100,
+            'processed_files': ["file1.jsonl", "file2.jsonl"],
+            'timed_out_files': ["file3.jsonl"],
+            'started_at': _STARTED,
+            'last_updated': _STARTED + 10
+        }))
+        setup = InitialSetup(storage_dir="/storage")
+
         loaded = setup._load_state()
 
         assert loaded is not None
         assert loaded.total_files == 100
         assert len(loaded.processed_files) == 2
         assert loaded.timed_out_files == ["file3.jsonl"]
-        assert loaded.started_at == started
+        assert loaded.started_at == _STARTED
 
-    def test_load_state_missing_file(self, tmp_path):
+    def test_load_state_missing_file(self, fs):
         """Test loading state when file doesn't exist."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
+        fs.create_dir("/storage")
 
-        setup = InitialSetup(storage_dir=str(storage_dir))
+        setup = InitialSetup(storage_dir="/storage")
         loaded = setup._load_state()
 
         assert loaded is None
 
-    def test_load_state_invalid_json(self, tmp_path):
+    def test_load_state_invalid_json(self, fs):
         """Test loading state with invalid JSON."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
-        state_file = storage_dir / "setup_state.json"
-        state_file.write_text("invalid json{")
+        fs.create_file("/storage/setup_state.json", contents="invalid json{")
 
-        setup = InitialSetup(storage_dir=str(storage_dir))
+        setup = InitialSetup(storage_dir="/storage")
         loaded = setup._load_state()
 
         assert loaded is None
 
-    def test_delete_state(self, tmp_path):
+    def test_delete_state(self, fs):
         """Test deleting state file."""
-        storage_dir = tmp_path / "storage"
-        storage_dir.mkdir()
-        state_file = storage_dir / "setup_state.json"
-        state_file.write_text("{}")
+        state_file = fs.create_file("/storage/setup_state.json", contents="{}")
 
-        setup = InitialSetup(storage_dir=str(storage_dir))
-        assert state_file.exists()
+        setup = InitialSetup(storage_dir="/storage")
+        assert Path(state_file.path).exists()
 
         setup._delete_state()
-        assert not state_file.exists()
+        assert not Path(state_file.path).exists()
 
 
 class TestInitialSetupExtractProject:
     """Tests for project extraction."""
 
-    def test_extract_project_from_projects_path(self):
-        """Test extracting project from path with 'projects' directory."""
-        setup = InitialSetup()
-        file_path = Path("/home/user/.claude/projects/myproject/sessions/session1.jsonl")
-
-        project = setup._extract_project(file_path)
-        assert project == "myproject"
-
-    def test_extract_project_without_projects_path(self):
-        """Test extracting project from path without 'projects' directory."""
-        setup = InitialSetup()
-        file_path = Path("/home/user/.claude/session1.jsonl")
-
-        project = setup._extract_project(file_path)
-        assert project == "unknown"
-
-    def test_extract_project_edge_case(self):
-        """Test extracting project from path where 'projects' is last."""
-        setup = InitialSetup()
-        file_path = Path("/home/user/.claude/projects")
-
-        project = setup._extract_project(file_path)
-        assert project == "unknown"
+    @pytest.mark.parametrize("file_path,expected", [
+        # Path with 'projects' directory
+        ("/home/user/.claude/projects/myproject/sessions/session1.jsonl", "myproject"),
+        # Path without 'projects' directory
+        ("/home/user/.claude/session1.jsonl", "unknown"),
+        # Edge case where 'projects' is last
+        ("/home/user/.claude/projects", "unknown"),
+    ])
+    def test_extract_project(self, stateless_setup, file_path, expected):
+        """Test extracting the project name from a session file path."""
+        assert stateless_setup._extract_project(Path(file_path)) == expected
 
 
 class TestInitialSetupEstimateTime:
     """Tests for time estimation."""
 
-    def test_estimate_remaining_time_zero_processed(self):
-        """Test estimating time when no files processed."""
-        setup = InitialSetup()
-        remaining = setup._estimate_remaining_time(0, 100, 0.0)
-
-        assert remaining == 0.0
-
-    def test_estimate_remaining_time_half_complete(self):
-        """Test estimating time when half complete."""
-        setup = InitialSetup()
-        remaining = setup._estimate_remaining_time(50, 100, 100.0)
-
-        assert remaining == 100.0  # Should take another 100s
+    @pytest.mark.parametrize("processed,total,elapsed,expected", [
+        (0, 100, 0.0, 0.0),  # No files processed
+        (50, 100, 100.0, 100.0),  # Half complete: another 100s
+        (99, 100, 99.0, 1.0),  # Nearly complete
+    ])
+    def test_estimate_remaining_time(self, stateless_setup, processed, total, elapsed, expected):
+        """Test estimating remaining time from current progress."""
+        remaining = stateless_setup._estimate_remaining_time(processed, total, elapsed)
 
-    def test_estimate_remaining_time_nearly_complete(self):
-        """Test estimating time when nearly complete."""
-        setup = InitialSetup()
-        remaining = setup._estimate_remaining_time(99, 100, 99.0)
-
-        assert remaining == pytest.approx(1.0, rel=0.01)
+        assert remaining == expected
 
 
 class TestInitialSetupProgressNotification:
     """Tests for progress notification."""
 
-    def test_notify_progress_with_callback(self):
+    def test_notify_progress_with_callback(self, frozen_time):
         """Test that progress notification calls callback."""
         callback = Mock()
         setup = InitialSetup(progress_callback=callback)
@@ -412,7 +382,7 @@ class TestInitialSetupProgressNotification:
             processed=50,
             current_file="session.jsonl",
             total_chunks=1000,
-            start_time=time.time() - 60
+            start_time=frozen_time[0] - 60
         )
 
         callback.assert_called_once()
@@ -420,8 +390,10 @@ class TestInitialSetupProgressNotification:
         assert isinstance(progress, SetupProgress)
         assert progress.total_files == 100
         assert progress.processed_files == 50
+        assert progress.elapsed_time == 60.0
+        assert progress.estimated_remaining == 60.0
 
-    def test_notify_progress_without_callback(self):
+    def test_notify_progress_without_callback(self, frozen_time):
         """Test that progress notification without callback doesn't crash."""
         setup = InitialSetup(progress_callback=None)
 
@@ -431,10 +403,10 @@ class TestInitialSetupProgressNotification:
             processed=50,
             current_file="session.jsonl",
             total_chunks=1000,
-            start_time=time.time()
+            start_time=frozen_time[0]
         )
 
-    def test_notify_progress_complete(self):
+    def test_notify_progress_complete(self, frozen_time):
         """Test progress notification when complete."""
         callback = Mock()
         setup = InitialSetup(progress_callback=callback)
@@ -444,12 +416,14 @@ class TestInitialSetupProgressNotification:
             processed=100,
             current_file="",
             total_chunks=2000,
-            start_time=time.time() - 300,
+            start_time=frozen_time[0] - 300,
             is_complete=True
         )
 
         progress = callback.call_args[0][0]
         assert progress.is_complete is True
+        assert progress.elapsed_time == 300.0
+        assert progress.estimated_remaining == 0.0
 
 
 class TestInitialSetupInterruption:
@@ -467,16 +441,27 @@ class TestInitialSetupInterruption:
 class TestInitialSetupIntegration:
     """Integration tests for setup process."""
 
-    @patch('smart_fork.initial_setup.EmbeddingService')
-    @patch('smart_fork.initial_setup.VectorDBService')
-    @patch('smart_fork.initial_setup.SessionRegistry')
-    def test_initialize_services(
-        self,
-        mock_registry,
-        mock_vector_db,
-        mock_embedding,
-        tmp_path
-    ):
+    @pytest.fixture(autouse=True)
+    def patched_services(self, monkeypatch):
+        """Replace the service classes used by InitialSetup with mocks."""
+        mocks = SimpleNamespace(
+            embedding=Mock(),
+            vector_db=Mock(),
+            registry=Mock(),
+            parser=Mock(),
+            chunking=Mock()
+        )
+        for name, mock in [
+            ("EmbeddingService", mocks.embedding),
+            ("VectorDBService", mocks.vector_db),
+            ("SessionRegistry", mocks.registry),
+            ("SessionParser", mocks.parser),
+            ("ChunkingService", mocks.chunking),
+        ]:
+            monkeypatch.setattr(f"smart_fork.initial_setup.{name}", mock)
+        return mocks
+
+    def test_initialize_services(self, patched_services, tmp_path):
         """Test service initialization."""
         storage_dir = tmp_path / "storage"
         setup = InitialSetup(storage_dir=str(storage_dir))
@@ -484,18 +469,11 @@ class TestInitialSetupIntegration:
         setup._initialize_services()
 
         assert storage_dir.exists()
-        mock_embedding.assert_called_once()
-        mock_vector_db.assert_called_once()
-        mock_registry.assert_called_once()
-
-    @patch('smart_fork.initial_setup.SessionParser')
-    @patch('smart_fork.initial_setup.ChunkingService')
-    def test_process_session_file_mock(
-        self,
-        mock_chunking,
-        mock_parser,
-        tmp_path
-    ):
+        patched_services.embedding.assert_called_once()
+        patched_services.vector_db.assert_called_once()
+        patched_services.registry.assert_called_once()
+
+    def test_process_session_file_mock(self, tmp_path):
         """Test processing a session file with mocks."""
         storage_dir = tmp_path / "storage"
         setup = InitialSetup(storage_dir=str(storage_dir))
@@ -505,23 +483,10 @@ class TestInitialSetupIntegration:
         setup.vector_db_service = Mock()
         setup.session_registry = Mock()
 
-        # Mock session data
-        mock_session_data = Mock()
-        mock_session_data.messages = [
-            Mock(timestamp="2024-01-01T00:00:00Z", content="test")
-        ]
-        setup.session_parser.parse_file.return_value = mock_session_data
-
-        # Mock chunks
-        mock_chunk = Mock()
-        mock_chunk.content = "test chunk"
-        mock_chunk.start_index = 0
-        mock_chunk.end_index = 1
-        mock_chunk.message_indices = [0]
-        setup.chunking_service.chunk_messages.return_value = [mock_chunk]
-
-        # Mock embeddings
-        setup.embedding_service.embed_texts.return_value = [[0.1] * 384]
+        # Parsed session, chunks and embeddings only need plain attributes
+        setup.session_parser.parse_file.return_value = _FAKE_SESSION_DATA
+        setup.chunking_service.chunk_messages.return_value = [_FAKE_CHUNK]
+        setup.embedding_service.embed_texts.return_value = [_FAKE_EMBEDDING]
 
         # Create test file
         test_file = tmp_path / "test_session.jsonl"
@@ -552,28 +517,13 @@ class TestInitialSetupIntegration:
         assert result['files_processed'] == 0
         assert 'No session files found' in result['message']
 
-    @patch('smart_fork.initial_setup.EmbeddingService')
-    @patch('smart_fork.initial_setup.VectorDBService')
-    @patch('smart_fork.initial_setup.SessionRegistry')
-    def test_run_setup_with_interruption(
-        self,
-        mock_registry,
-        mock_vector_db,
-        mock_embedding,
-        tmp_path
-    ):
+    def test_run_setup_with_interruption(self, tmp_path, claude_tree):
         """Test that setup handles interruption gracefully."""
         storage_dir = tmp_path / "storage"
-        claude_dir = tmp_path / "claude"
-        claude_dir.mkdir()
-
-        # Create test files
-        (claude_dir / "session1.jsonl").write_text("x" * 200)
-        (claude_dir / "session2.jsonl").write_text("x" * 200)
 
         setup = InitialSetup(
             storage_dir=str(storage_dir),
-            claude_dir=str(claude_dir)
+            claude_dir=str(claude_tree)
         )
 
         # Interrupt immediately
@@ -4,27 +4,107 @@ Tests the full end-to-end workflow of MCP tool invocation, simulating
 how a real MCP client (like Claude Code) would interact with the server.
 """
 
-import json
-import tempfile
-from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from unittest.mock import Mock, patch
 
 import pytest
 
-from smart_fork.embedding_service import EmbeddingService
-from smart_fork.fork_generator import ForkGenerator
-from smart_fork.scoring_service import ScoringService, SessionScore
+from smart_fork.scoring_service import SessionScore
 from smart_fork.search_service import SearchService, SessionSearchResult
-from smart_fork.selection_ui import SelectionUI
 from smart_fork.server import (
     MCPServer,
     create_fork_detect_handler,
     create_server,
     format_search_results_with_selection,
 )
-from smart_fork.session_registry import SessionMetadata, SessionRegistry
-from smart_fork.vector_db_service import VectorDBService
+from smart_fork.session_registry import SessionMetadata
+from tests._mcp_helpers import CORE_TOOLS, TOOL_FIELDS, expect_error, expect_success
+from tests._stubs import (
+    StubEmbeddingService,
+    StubScoringService,
+    StubSessionRegistry,
+    StubVectorDBService,
+)
+
+
+# JSON-RPC message templates copied by MockMCPClient; the server never
+# mutates params, so the empty params dict is shared
+_REQUEST_TEMPLATE: Dict[str, Any] = {"jsonrpc": "2.0", "id": 0, "method": "", "params": {}}
+_NOTIFICATION_TEMPLATE: Dict[str, Any] = {"jsonrpc": "2.0", "method": "", "params": {}}
+_EMPTY_PARAMS: Dict[str, Any] = {}
+
+# Search results shared by the workflow tests, ordered by descending score
+_MOCK_RESULTS = (
+    SessionSearchResult(
+        session_id='session1',
+        score=SessionScore(
+            session_id='session1',
+            final_score=0.95,
+            best_similarity=0.95,
+            avg_similarity=0.90,
+            chunk_ratio=0.80,
+            recency_score=0.85,
+            chain_quality=0.75,
+            memory_boost=0.0,
+            num_chunks_matched=5,
+            preference_boost=0.0
+        ),
+        metadata=SessionMetadata(
+            session_id='session1',
+            created_at='2024-01-01T00:00:00',
+            message_count=10,
+            chunk_count=5
+        ),
+        preview='Implementing user authentication with JWT',
+        matched_chunks=[]
+    ),
+    SessionSearchResult(
+        session_id='session2',
+        score=SessionScore(
+            session_id='session2',
+            final_score=0.85,
+            best_similarity=0.85,
+            avg_similarity=0.80,
+            chunk_ratio=0.70,
+            recency_score=0.75,
+            chain_quality=0.65,
+            memory_boost=0.0,
+            num_chunks_matched=4,
+            preference_boost=0.0
+        ),
+        metadata=SessionMetadata(
+            session_id='session2',
+            created_at='2024-01-02T00:00:00',
+            message_count=8,
+            chunk_count=4
+        ),
+        preview='OAuth authentication flow',
+        matched_chunks=[]
+    ),
+    SessionSearchResult(
+        session_id='session3',
+        score=SessionScore(
+            session_id='session3',
+            final_score=0.75,
+            best_similarity=0.75,
+            avg_similarity=0.70,
+            chunk_ratio=0.60,
+            recency_score=0.70,
+            chain_quality=0.55,
+            memory_boost=0.0,
+            num_chunks_matched=6,
+            preference_boost=0.0
+        ),
+        metadata=SessionMetadata(
+            session_id='session3',
+            created_at='2024-01-03T00:00:00',
+            message_count=12,
+            chunk_count=6
+        ),
+        preview='Setting up authentication middleware',
+        matched_chunks=[]
+    )
+)
 
 
 class MockMCPClient:
@@ -35,79 +115,118 @@ class MockMCPClient:
         self.server = server
         self.request_id = 0
 
+    def reset(self) -> None:
+        """Restart request IDs so the next request uses ID 1."""
+        self.request_id = 0
+
     def send_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Send a request to the server and return the response."""
         self.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.request_id,
-            "method": method,
-            "params": params or {}
-        }
+        request = _REQUEST_TEMPLATE.copy()
+        request["id"] = self.request_id
+        request["method"] = method
+        request["params"] = params or _EMPTY_PARAMS
         return self.server.handle_request(request)
 
     def send_notification(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
         """Send a notification to the server (no response expected)."""
-        request = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {}
-        }
+        request = _NOTIFICATION_TEMPLATE.copy()
+        request["method"] = method
+        request["params"] = params or _EMPTY_PARAMS
         self.server.handle_request(request)
 
+    def send_batch(self, messages: List[Tuple[str, Optional[Dict[str, Any]], bool]]) -> List[Dict[str, Any]]:
+        """
+        Send several messages as one JSON-RPC batch.
+
+        Args:
+            messages: (method, params, is_notification) tuples
+
+        Returns:
+            Responses for the non-notification messages, in order
+        """
+        batch = []
+        for method, params, is_notification in messages:
+            if is_notification:
+                request = _NOTIFICATION_TEMPLATE.copy()
+            else:
+                self.request_id += 1
+                request = _REQUEST_TEMPLATE.copy()
+                request["id"] = self.request_id
+            request["method"] = method
+            request["params"] = params or _EMPTY_PARAMS
+            batch.append(request)
+        return self.server.handle_request(batch) or []
+
+
+@pytest.fixture(scope="module")
+def mcp_server() -> MCPServer:
+    """Create one fully configured server shared by the tests in this module."""
+    return create_server()
+
+
+@pytest.fixture(scope="module")
+def shared_mock_client(mcp_server: MCPServer) -> MockMCPClient:
+    """Create one client on the shared server for the whole module."""
+    return MockMCPClient(mcp_server)
+
+
+@pytest.fixture
+def mcp_client(shared_mock_client: MockMCPClient) -> MockMCPClient:
+    """Provide the shared client with request IDs restarted at 1."""
+    shared_mock_client.reset()
+    return shared_mock_client
+
+
+@pytest.fixture(scope="module")
+def initialized_client(mcp_server: MCPServer) -> MockMCPClient:
+    """Create a client that has completed the initialize handshake once per module."""
+    client = MockMCPClient(mcp_server)
+    client.send_request("initialize", {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {
+            "name": "test-client",
+            "version": "1.0.0"
+        }
+    })
+    client.send_notification("notifications/initialized")
+    return client
+
 
 class TestMCPClientIntegration:
     """Test MCP tool flow from client perspective."""
 
-    def test_client_initialization_flow(self):
+    def test_client_initialization_flow(self, mcp_client):
         """Test complete client initialization sequence."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        # Step 1: Client sends initialize request
-        response = client.send_request("initialize", {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "test-client",
-                "version": "1.0.0"
-            }
-        })
-
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
-        assert "result" in response
-        assert response["result"]["protocolVersion"] == "2024-11-05"
-        assert response["result"]["serverInfo"]["name"] == "smart-fork"
-        assert "capabilities" in response["result"]
-
-        # Step 2: Client sends initialized notification
-        client.send_notification("notifications/initialized")
-
-        # Step 3: Client requests tool list
-        response = client.send_request("tools/list")
-
-        assert response is not None
-        assert "result" in response
-        assert "tools" in response["result"]
-        assert len(response["result"]["tools"]) == 4
-        tool_names = [t["name"] for t in response["result"]["tools"]]
-        assert "fork-detect" in tool_names
-        assert "get-session-preview" in tool_names
-        assert "record-fork" in tool_names
-        assert "get-fork-history" in tool_names
-
-    def test_fork_detect_tool_invocation(self):
+        # initialize request, initialized notification and tools/list in one batch
+        init_response, tools_response = mcp_client.send_batch([
+            ("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {
+                    "name": "test-client",
+                    "version": "1.0.0"
+                }
+            }, False),
+            ("notifications/initialized", None, True),
+            ("tools/list", None, False),
+        ])
+
+        result = expect_success(init_response, rid=1)
+        assert result["protocolVersion"] == "2024-11-05"
+        assert result["serverInfo"]["name"] == "smart-fork"
+        assert "capabilities" in result
+
+        result = expect_success(tools_response, rid=2)
+        assert len(result["tools"]) == 4
+        tool_names = frozenset(t["name"] for t in result["tools"])
+        assert CORE_TOOLS <= tool_names
+
+    def test_fork_detect_tool_invocation(self, initialized_client):
         """Test invoking fork-detect tool via MCP protocol."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        # Initialize connection
-        client.send_request("initialize")
-        client.send_notification("notifications/initialized")
-
         # Invoke fork-detect tool
-        response = client.send_request("tools/call", {
+        response = initialized_client.send_request("tools/call", {
             "name": "fork-detect",
             "arguments": {"query": "implement authentication"}
         })
@@ -119,16 +238,10 @@ class TestMCPClientIntegration:
         assert response["result"]["content"][0]["type"] == "text"
         assert "implement authentication" in response["result"]["content"][0]["text"]
 
-    def test_fork_detect_tool_empty_query_error(self):
+    def test_fork_detect_tool_empty_query_error(self, initialized_client):
         """Test fork-detect tool with empty query returns error message."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        client.send_request("initialize")
-        client.send_notification("notifications/initialized")
-
         # Invoke with empty query
-        response = client.send_request("tools/call", {
+        response = initialized_client.send_request("tools/call", {
             "name": "fork-detect",
             "arguments": {}
         })
@@ -139,16 +252,10 @@ class TestMCPClientIntegration:
         text = response["result"]["content"][0]["text"]
         assert "Error" in text or "provide a query" in text
 
-    def test_fork_detect_tool_invalid_arguments(self):
+    def test_fork_detect_tool_invalid_arguments(self, initialized_client):
         """Test fork-detect tool with invalid arguments."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        client.send_request("initialize")
-        client.send_notification("notifications/initialized")
-
         # Invoke with invalid arguments (missing required query)
-        response = client.send_request("tools/call", {
+        response = initialized_client.send_request("tools/call", {
             "name": "fork-detect",
             "arguments": {"invalid_param": "value"}
         })
@@ -158,16 +265,10 @@ class TestMCPClientIntegration:
         assert "result" in response
         assert "content" in response["result"]
 
-    def test_unknown_tool_error(self):
+    def test_unknown_tool_error(self, initialized_client):
         """Test that invoking unknown tool returns proper error."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        client.send_request("initialize")
-        client.send_notification("notifications/initialized")
-
         # Invoke non-existent tool
-        response = client.send_request("tools/call", {
+        response = initialized_client.send_request("tools/call", {
             "name": "non-existent-tool",
             "arguments": {}
         })
@@ -177,12 +278,9 @@ class TestMCPClientIntegration:
         assert "Unknown tool" in response["error"]["message"]
         assert response["error"]["code"] == -32603
 
-    def test_unknown_method_error(self):
+    def test_unknown_method_error(self, mcp_client):
         """Test that unknown method returns proper error."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response = client.send_request("unknown/method")
+        response = mcp_client.send_request("unknown/method")
 
         assert response is not None
         assert "error" in response
@@ -193,113 +291,43 @@ class TestMCPClientIntegration:
 class TestSearchSelectForkWorkflow:
     """Test complete search-select-fork workflow."""
 
-    @pytest.fixture
-    def temp_db_dir(self):
-        """Create temporary directory for test database."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield Path(tmpdir)
+    @pytest.fixture(scope="module")
+    def temp_db_dir(self, tmp_path_factory):
+        """Create a directory seeded with session files, shared by the module."""
+        sessions_dir = tmp_path_factory.mktemp("sessions")
+        for i in range(1, 4):
+            session_file = sessions_dir / f'session{i}.jsonl'
+            session_file.write_text('{"role": "user", "content": "test"}\n')
+        return sessions_dir
+
+    @pytest.fixture(scope="module")
+    def service_stubs(self):
+        """Create stub search service dependencies once per module."""
+        return {
+            "embedding": StubEmbeddingService(),
+            "vector_db": StubVectorDBService(),
+            "registry": StubSessionRegistry(),
+            "scoring": StubScoringService()
+        }
 
     @pytest.fixture
-    def mock_search_service(self, temp_db_dir):
-        """Create mock search service with sample data."""
-        # Create mock dependencies
-        embedding_service = Mock(spec=EmbeddingService)
-        vector_db_service = Mock(spec=VectorDBService)
-        session_registry = Mock(spec=SessionRegistry)
-        scoring_service = Mock(spec=ScoringService)
-
-        # Create search service with correct parameter names
-        search_service = SearchService(
-            embedding_service=embedding_service,
-            vector_db_service=vector_db_service,
-            session_registry=session_registry,
-            scoring_service=scoring_service
+    def search_service(self, service_stubs):
+        """Create a search service wired to the shared dependency stubs."""
+        return SearchService(
+            embedding_service=service_stubs["embedding"],
+            vector_db_service=service_stubs["vector_db"],
+            session_registry=service_stubs["registry"],
+            scoring_service=service_stubs["scoring"]
         )
 
-        # Mock search results - use SessionSearchResult objects
-        mock_results = [
-            SessionSearchResult(
-                session_id='session1',
-                score=SessionScore(
-                    session_id='session1',
-                    final_score=0.95,
-                    best_similarity=0.95,
-                    avg_similarity=0.90,
-                    chunk_ratio=0.80,
-                    recency_score=0.85,
-                    chain_quality=0.75,
-                    memory_boost=0.0,
-                    num_chunks_matched=5,
-                    preference_boost=0.0
-                ),
-                metadata=SessionMetadata(
-                    session_id='session1',
-                    created_at='2024-01-01T00:00:00',
-                    message_count=10,
-                    chunk_count=5
-                ),
-                preview='Implementing user authentication with JWT',
-                matched_chunks=[]
-            ),
-            SessionSearchResult(
-                session_id='session2',
-                score=SessionScore(
-                    session_id='session2',
-                    final_score=0.85,
-                    best_similarity=0.85,
-                    avg_similarity=0.80,
-                    chunk_ratio=0.70,
-                    recency_score=0.75,
-                    chain_quality=0.65,
-                    memory_boost=0.0,
-                    num_chunks_matched=4,
-                    preference_boost=0.0
-                ),
-                metadata=SessionMetadata(
-                    session_id='session2',
-                    created_at='2024-01-02T00:00:00',
-                    message_count=8,
-                    chunk_count=4
-                ),
-                preview='OAuth authentication flow',
-                matched_chunks=[]
-            ),
-            SessionSearchResult(
-                session_id='session3',
-                score=SessionScore(
-                    session_id='session3',
-                    final_score=0.75,
-                    best_similarity=0.75,
-                    avg_similarity=0.70,
-                    chunk_ratio=0.60,
-                    recency_score=0.70,
-                    chain_quality=0.55,
-                    memory_boost=0.0,
-                    num_chunks_matched=6,
-                    preference_boost=0.0
-                ),
-                metadata=SessionMetadata(
-                    session_id='session3',
-                    created_at='2024-01-03T00:00:00',
-                    message_count=12,
-                    chunk_count=6
-                ),
-                preview='Setting up authentication middleware',
-                matched_chunks=[]
-            )
-        ]
-
-        # Patch search method
-        with patch.object(search_service, 'search', return_value=mock_results):
+    @pytest.fixture
+    def mock_search_service(self, search_service):
+        """Create mock search service with sample data."""
+        with patch.object(search_service, 'search', return_value=list(_MOCK_RESULTS)):
             yield search_service
 
     def test_full_search_select_workflow(self, mock_search_service, temp_db_dir):
         """Test complete workflow from search to fork command generation."""
-        # Create session files
-        for i in range(1, 4):
-            session_file = temp_db_dir / f'session{i}.jsonl'
-            session_file.write_text('{"role": "user", "content": "test"}\n')
-
         # Create handler with mock search service
         handler = create_fork_detect_handler(
             search_service=mock_search_service,
@@ -320,27 +348,14 @@ class TestSearchSelectForkWorkflow:
         # Verify result contains fork commands
         assert "fork" in result.lower() or "claude" in result.lower()
 
-    def test_search_with_no_results(self, temp_db_dir):
+    def test_search_with_no_results(self, search_service, service_stubs, temp_db_dir):
         """Test workflow when search returns no results."""
-        # Create empty search service with correct parameters
-        embedding_service = Mock(spec=EmbeddingService)
-        vector_db_service = Mock(spec=VectorDBService)
-        session_registry = Mock(spec=SessionRegistry)
-        scoring_service = Mock(spec=ScoringService)
-
-        search_service = SearchService(
-            embedding_service=embedding_service,
-            vector_db_service=vector_db_service,
-            session_registry=session_registry,
-            scoring_service=scoring_service
-        )
-
         # Mock empty search results
         with patch.object(search_service, 'search', return_value=[]):
             handler = create_fork_detect_handler(
                 search_service=search_service,
                 claude_dir=str(temp_db_dir),
-                session_registry=session_registry
+                session_registry=service_stubs["registry"]
             )
 
             result = handler({"query": "non-existent topic"})
@@ -352,41 +367,10 @@ class TestSearchSelectForkWorkflow:
 
     def test_format_search_results_with_selection(self, temp_db_dir):
         """Test formatting search results with selection UI."""
-        # Create mock results using SessionSearchResult objects
-        results = [
-            SessionSearchResult(
-                session_id='session1',
-                score=SessionScore(
-                    session_id='session1',
-                    final_score=0.95,
-                    best_similarity=0.95,
-                    avg_similarity=0.90,
-                    chunk_ratio=0.80,
-                    recency_score=0.85,
-                    chain_quality=0.75,
-                    memory_boost=0.0,
-                    num_chunks_matched=5,
-                    preference_boost=0.0
-                ),
-                metadata=SessionMetadata(
-                    session_id='session1',
-                    created_at='2024-01-01T00:00:00',
-                    message_count=10,
-                    chunk_count=5
-                ),
-                preview='Authentication implementation',
-                matched_chunks=[]
-            )
-        ]
-
-        # Create session file
-        session_file = temp_db_dir / 'session1.jsonl'
-        session_file.write_text('{"role": "user", "content": "test"}\n')
-
         # Format results
         formatted = format_search_results_with_selection(
             query="authentication",
-            results=results,
+            results=list(_MOCK_RESULTS[:1]),
             claude_dir=str(temp_db_dir)
         )
 
@@ -410,91 +394,54 @@ class TestSearchSelectForkWorkflow:
 class TestMCPResponseFormat:
     """Test MCP response format compliance."""
 
-    def test_response_has_jsonrpc_version(self):
-        """Test all responses include JSON-RPC version."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        # Test various methods
-        methods = ["initialize", "tools/list"]
-        for method in methods:
-            response = client.send_request(method)
-            assert response is not None
-            assert "jsonrpc" in response
-            assert response["jsonrpc"] == "2.0"
-
-    def test_response_has_matching_id(self):
+    @pytest.mark.parametrize(
+        "method,params,has_error",
+        [
+            ("initialize", None, False),
+            ("tools/list", None, False),
+            ("tools/call", {"name": "fork-detect", "arguments": {"query": "test"}}, False),
+            ("unknown/method", None, True),
+        ],
+        ids=["initialize", "tools_list", "tools_call", "unknown_method"]
+    )
+    def test_response_shape(self, initialized_client, method, params, has_error):
+        """Test responses carry the JSON-RPC version and exactly one of result/error."""
+        response = initialized_client.send_request(method, params)
+
+        if has_error:
+            expect_error(response)
+        else:
+            expect_success(response)
+
+    def test_response_has_matching_id(self, mcp_client):
         """Test responses include matching request ID."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response1 = client.send_request("initialize")
-        assert response1["id"] == 1
-
-        response2 = client.send_request("tools/list")
-        assert response2["id"] == 2
-
-        response3 = client.send_request("tools/call", {
+        expect_success(mcp_client.send_request("initialize"), rid=1)
+        expect_success(mcp_client.send_request("tools/list"), rid=2)
+        expect_success(mcp_client.send_request("tools/call", {
             "name": "fork-detect",
             "arguments": {"query": "test"}
-        })
-        assert response3["id"] == 3
-
-    def test_success_response_has_result(self):
-        """Test successful responses have result field."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response = client.send_request("initialize")
-        assert "result" in response
-        assert "error" not in response
-
-    def test_error_response_has_error(self):
-        """Test error responses have error field with code and message."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response = client.send_request("unknown/method")
-        assert "error" in response
-        assert "result" not in response
-        assert "code" in response["error"]
-        assert "message" in response["error"]
-        assert isinstance(response["error"]["code"], int)
-        assert isinstance(response["error"]["message"], str)
+        }), rid=3)
 
-    def test_tools_list_response_format(self):
+    def test_tools_list_response_format(self, mcp_client):
         """Test tools/list response matches MCP spec."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response = client.send_request("tools/list")
-        assert "result" in response
-        assert "tools" in response["result"]
-        assert isinstance(response["result"]["tools"], list)
+        result = expect_success(mcp_client.send_request("tools/list"))
+        assert isinstance(result["tools"], list)
 
         # Check tool format
-        for tool in response["result"]["tools"]:
-            assert "name" in tool
-            assert "description" in tool
-            assert "inputSchema" in tool
+        for tool in result["tools"]:
+            assert TOOL_FIELDS <= tool.keys()
             assert isinstance(tool["inputSchema"], dict)
 
-    def test_tools_call_response_format(self):
+    def test_tools_call_response_format(self, mcp_client):
         """Test tools/call response matches MCP spec."""
-        server = create_server()
-        client = MockMCPClient(server)
-
-        response = client.send_request("tools/call", {
+        result = expect_success(mcp_client.send_request("tools/call", {
             "name": "fork-detect",
             "arguments": {"query": "test"}
-        })
-
-        assert "result" in response
-        assert "content" in response["result"]
-        assert isinstance(response["result"]["content"], list)
+        }))
+        assert isinstance(result["content"], list)
 
         # Check content format
-        for content_item in response["result"]["content"]:
+        for content_item in result["content"]:
             assert "type" in content_item
             assert content_item["type"] == "text"
             assert "text" in content_item
@@ -526,12 +473,10 @@ class TestErrorHandling:
         assert isinstance(result, str)
         assert "Error" in result or "Database connection failed" in result
 
-    def test_malformed_request_handling(self):
+    def test_malformed_request_handling(self, mcp_server):
         """Test handling of malformed requests."""
-        server = create_server()
-
         # Missing jsonrpc field
-        response = server.handle_request({
+        response = mcp_server.handle_request({
             "id": 1,
             "method": "initialize"
         })
@@ -539,7 +484,7 @@ class TestErrorHandling:
         assert response is not None
 
         # Missing method field
-        response = server.handle_request({
+        response = mcp_server.handle_request({
             "jsonrpc": "2.0",
             "id": 2
         })
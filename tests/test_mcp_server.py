@@ -1,13 +1,20 @@
 """Tests for MCP server boilerplate."""
 
 import json
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 from typing import Any, Dict
 from unittest.mock import patch
 
 import pytest
 
 from smart_fork.server import MCPServer, create_server, fork_detect_handler
+from tests._mcp_helpers import CORE_TOOLS, TOOL_FIELDS, expect_error, expect_success
+
+
+@pytest.fixture(scope="module")
+def mcp_server() -> MCPServer:
+    """Create one fully configured server shared by the tests in this module."""
+    return create_server()
 
 
 class TestMCPServer:
@@ -56,28 +63,75 @@ class TestMCPServer:
         assert "tools" in result
         assert result["tools"] == []
 
-    def test_handle_tools_list_with_tools(self) -> None:
-        """Test tools/list with registered tools."""
-        server = create_server()
+    def test_handle_tools_list_cached_until_register(self) -> None:
+        """Test tools/list reuses its listing until another tool is registered."""
+        server = MCPServer()
+        server.handle_tools_list({})
+        cached = server._tools_list_cache
+        server.handle_tools_list({})
+        assert server._tools_list_cache is cached
+
+        server.register_tool(
+            name="test-tool",
+            description="A test tool",
+            input_schema={"type": "object"},
+            handler=lambda args: "test"
+        )
+
         result = server.handle_tools_list({})
+        assert server._tools_list_cache is not cached
+        assert [t["name"] for t in result["tools"]] == ["test-tool"]
+
+    def test_handle_tools_list_result_mutation_is_isolated(self) -> None:
+        """Test that editing a tools/list result does not leak into later replies."""
+        server = MCPServer()
+        server.register_tool(
+            name="test-tool",
+            description="A test tool",
+            input_schema={"type": "object"},
+            handler=lambda args: "test"
+        )
+
+        first = server.handle_tools_list({})
+        first["tools"][0]["description"] = "changed"
+        first["tools"].append({"name": "bogus"})
+
+        second = server.handle_tools_list({})
+        assert [t["name"] for t in second["tools"]] == ["test-tool"]
+        assert second["tools"][0]["description"] == "A test tool"
+
+    def test_handle_tools_list_sorted_by_name(self) -> None:
+        """Test tools/list output does not depend on registration order."""
+        listings = []
+        for names in (["b-tool", "a-tool", "c-tool"], ["c-tool", "b-tool", "a-tool"]):
+            server = MCPServer()
+            for name in names:
+                server.register_tool(
+                    name=name,
+                    description=f"{name} description",
+                    input_schema={"type": "object"},
+                    handler=lambda args: name
+                )
+            listings.append(server.handle_tools_list({}))
+
+        assert [t["name"] for t in listings[0]["tools"]] == ["a-tool", "b-tool", "c-tool"]
+        assert listings[0] == listings[1]
+
+    def test_handle_tools_list_with_tools(self, mcp_server: MCPServer) -> None:
+        """Test tools/list with registered tools."""
+        result = mcp_server.handle_tools_list({})
 
         assert "tools" in result
         assert len(result["tools"]) == 4  # fork-detect, get-session-preview, record-fork, get-fork-history
-        tool_names = [t["name"] for t in result["tools"]]
-        assert "fork-detect" in tool_names
-        assert "get-session-preview" in tool_names
-        assert "record-fork" in tool_names
-        assert "get-fork-history" in tool_names
+        tool_names = frozenset(t["name"] for t in result["tools"])
+        assert CORE_TOOLS <= tool_names
         # Verify all tools have required properties
         for tool in result["tools"]:
-            assert "description" in tool
-            assert "inputSchema" in tool
+            assert TOOL_FIELDS <= tool.keys()
 
-    def test_handle_tools_call(self) -> None:
+    def test_handle_tools_call(self, mcp_server: MCPServer) -> None:
         """Test tools/call request handling."""
-        server = create_server()
-
-        result = server.handle_tools_call({
+        result = mcp_server.handle_tools_call({
             "name": "fork-detect",
             "arguments": {"query": "test query"}
         })
@@ -107,17 +161,11 @@ class TestMCPServer:
             "params": {}
         }
 
-        response = server.handle_request(request)
-
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 1
-        assert "result" in response
-        assert response["result"]["serverInfo"]["name"] == "smart-fork"
+        result = expect_success(server.handle_request(request), rid=1)
+        assert result["serverInfo"]["name"] == "smart-fork"
 
-    def test_handle_request_tools_list(self) -> None:
+    def test_handle_request_tools_list(self, mcp_server: MCPServer) -> None:
         """Test full request handling for tools/list."""
-        server = create_server()
         request = {
             "jsonrpc": "2.0",
             "id": 2,
@@ -125,17 +173,11 @@ class TestMCPServer:
             "params": {}
         }
 
-        response = server.handle_request(request)
-
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 2
-        assert "result" in response
-        assert "tools" in response["result"]
+        result = expect_success(mcp_server.handle_request(request), rid=2)
+        assert "tools" in result
 
-    def test_handle_request_tools_call(self) -> None:
+    def test_handle_request_tools_call(self, mcp_server: MCPServer) -> None:
         """Test full request handling for tools/call."""
-        server = create_server()
         request = {
             "jsonrpc": "2.0",
             "id": 3,
@@ -146,13 +188,8 @@ class TestMCPServer:
             }
         }
 
-        response = server.handle_request(request)
-
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 3
-        assert "result" in response
-        assert "content" in response["result"]
+        result = expect_success(mcp_server.handle_request(request), rid=3)
+        assert "content" in result
 
     def test_handle_request_notification(self) -> None:
         """Test handling of notifications (no response expected)."""
@@ -167,6 +204,17 @@ class TestMCPServer:
 
         assert response is None
 
+    def test_handle_request_other_notification(self) -> None:
+        """Test any notifications/* method is accepted without a response."""
+        server = MCPServer()
+        request = {
+            "jsonrpc": "2.0",
+            "method": "notifications/cancelled",
+            "params": {"requestId": 1}
+        }
+
+        assert server.handle_request(request) is None
+
     def test_handle_request_unknown_method(self) -> None:
         """Test handling of unknown method returns error."""
         server = MCPServer()
@@ -177,13 +225,42 @@ class TestMCPServer:
             "params": {}
         }
 
-        response = server.handle_request(request)
+        error = expect_error(server.handle_request(request), rid=4)
+        assert "Unknown method" in error["message"]
+
+    def test_handle_request_batch(self, mcp_server: MCPServer) -> None:
+        """Test a batch returns responses in order and skips notifications."""
+        responses = mcp_server.handle_request([
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+            {"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}},
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+            {"jsonrpc": "2.0", "id": 3, "method": "unknown/method", "params": {}},
+        ])
+
+        assert isinstance(responses, list)
+        assert len(responses) == 3
+        expect_success(responses[0], rid=1)
+        assert "tools" in expect_success(responses[1], rid=2)
+        expect_error(responses[2], rid=3)
+
+    def test_handle_request_batch_only_notifications(self) -> None:
+        """Test a batch of notifications produces no response."""
+        server = MCPServer()
+        response = server.handle_request([
+            {"jsonrpc": "2.0", "method": "notifications/initialized", "params": {}}
+        ])
+
+        assert response is None
+
+    def test_handle_request_batch_invalid(self) -> None:
+        """Test empty batches and non-object entries return Invalid Request errors."""
+        server = MCPServer()
 
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 4
-        assert "error" in response
-        assert "Unknown method" in response["error"]["message"]
+        expect_error(server.handle_request([]), code=-32600)
+
+        responses = server.handle_request([1])
+        assert len(responses) == 1
+        expect_error(responses[0], code=-32600)
 
     def test_fork_detect_handler(self) -> None:
         """Test the fork-detect tool handler."""
@@ -202,14 +279,66 @@ class TestMCPServer:
         # Should show error message about providing a query
         assert "Error" in result or "provide a query" in result
 
-    def test_create_server(self) -> None:
+    def test_create_server(self, mcp_server: MCPServer) -> None:
         """Test server creation and configuration."""
-        server = create_server()
+        assert isinstance(mcp_server, MCPServer)
+        assert "fork-detect" in mcp_server.tools
+        assert mcp_server.tools["fork-detect"]["name"] == "fork-detect"
+        assert callable(mcp_server.tools["fork-detect"]["handler"])
+
+
+class TestMCPStdioTransport:
+    """Test the stdio read/serialize loop."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "stdlib"])
+    def test_run_round_trip(self, use_orjson: bool) -> None:
+        """Test requests read from stdin produce JSON responses on stdout."""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        stdin = StringIO(
+            '{"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}\n'
+            '\n'
+            'not json\n'
+            '{"jsonrpc": "2.0", "method": "notifications/initialized"}\n'
+        )
+        lines = self._run_stdio(MCPServer(), stdin, use_orjson)
+        assert len(lines) == 1
+        result = expect_success(json.loads(lines[0]), rid=1)
+        assert result["serverInfo"]["name"] == "smart-fork"
 
-        assert isinstance(server, MCPServer)
-        assert "fork-detect" in server.tools
-        assert server.tools["fork-detect"]["name"] == "fork-detect"
-        assert callable(server.tools["fork-detect"]["handler"])
+    @pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "stdlib"])
+    def test_run_non_ascii_query_on_ascii_locale(self, use_orjson: bool) -> None:
+        """Test non-ASCII replies are written even when stdout's encoding is ASCII."""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        request = {
+            "jsonrpc": "2.0",
+            "id": 7,
+            "method": "tools/call",
+            "params": {"name": "fork-detect", "arguments": {"query": "修复 café bug"}},
+        }
+        stdin = StringIO(json.dumps(request) + "\n")
+
+        lines = self._run_stdio(create_server(), stdin, use_orjson)
+        assert len(lines) == 1
+        result = expect_success(json.loads(lines[0]), rid=7)
+        assert "修复 café bug" in result["content"][0]["text"]
+
+    @staticmethod
+    def _run_stdio(server: MCPServer, stdin: StringIO, use_orjson: bool) -> list:
+        """Run the server over an ASCII-encoded stdout and return the UTF-8 lines."""
+        raw = BytesIO()
+        stdout = TextIOWrapper(raw, encoding="ascii")
+
+        with patch("sys.stdin", stdin), patch("sys.stdout", stdout):
+            if use_orjson:
+                server.run()
+            else:
+                with patch("smart_fork.server.orjson", None):
+                    server.run()
+
+        stdout.flush()
+        return raw.getvalue().decode("utf-8").splitlines()
 
 
 class TestMCPProtocol:
@@ -239,9 +368,7 @@ class TestMCPProtocol:
             "params": {}
         }
 
-        response = server.handle_request(request)
-        assert response is not None
-        assert response["jsonrpc"] == "2.0"
+        expect_success(server.handle_request(request))
 
     def test_error_response_format(self) -> None:
         """Test that error responses follow JSON-RPC format."""
@@ -253,9 +380,4 @@ class TestMCPProtocol:
             "params": {}
         }
 
-        response = server.handle_request(request)
-        assert response is not None
-        assert "error" in response
-        assert "code" in response["error"]
-        assert "message" in response["error"]
-        assert response["error"]["code"] == -32603
+        expect_error(server.handle_request(request), code=-32603)
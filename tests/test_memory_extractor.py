@@ -10,6 +10,7 @@ Tests cover:
 """
 
 import unittest
+from unittest.mock import patch
 from smart_fork.memory_extractor import MemoryExtractor, MemoryMarker
 
 
@@ -30,8 +31,9 @@ class TestMemoryExtractorInit(unittest.TestCase):
 class TestPatternDetection(unittest.TestCase):
     """Test PATTERN marker detection."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_detect_pattern_keyword(self):
         """Test detection of 'pattern' keyword."""
@@ -79,8 +81,9 @@ class TestPatternDetection(unittest.TestCase):
 class TestWorkingSolutionDetection(unittest.TestCase):
     """Test WORKING_SOLUTION marker detection."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_detect_working_solution(self):
         """Test detection of 'working solution'."""
@@ -128,8 +131,9 @@ class TestWorkingSolutionDetection(unittest.TestCase):
 class TestWaitingDetection(unittest.TestCase):
     """Test WAITING marker detection."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_detect_waiting(self):
         """Test detection of 'waiting'."""
@@ -177,8 +181,9 @@ class TestWaitingDetection(unittest.TestCase):
 class TestMultipleMemoryTypes(unittest.TestCase):
     """Test detection of multiple memory types in same content."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_pattern_and_working_solution(self):
         """Test detection of both PATTERN and WORKING_SOLUTION."""
@@ -212,8 +217,9 @@ class TestMultipleMemoryTypes(unittest.TestCase):
 class TestExtractMarkers(unittest.TestCase):
     """Test detailed marker extraction with context."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor(context_window=30)
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor(context_window=30)
 
     def test_extract_single_marker(self):
         """Test extracting a single marker."""
@@ -240,6 +246,42 @@ class TestExtractMarkers(unittest.TestCase):
         positions = [m.position for m in markers]
         self.assertEqual(positions, sorted(positions))
 
+    def test_mixed_case_positions_and_context(self):
+        """Test marker positions and context refer to the original-case content."""
+        content = "Step ONE: Apply the Design Pattern. Status: PENDING."
+        markers = self.extractor.extract_markers(content)
+
+        self.assertEqual(
+            [(m.memory_type, m.position) for m in markers],
+            [('PATTERN', content.index('Design')), ('WAITING', content.index('PENDING'))]
+        )
+        self.assertIn('Design Pattern', markers[0].context)
+
+    def test_non_ascii_markers(self):
+        """Test markers are found in content outside ASCII."""
+        content = "模式: the Strategy works; 待定 pending"
+        markers = self.extractor.extract_markers(content)
+
+        self.assertEqual(
+            [(m.memory_type, m.position) for m in markers],
+            [('PATTERN', content.index('Strategy')), ('WAITING', content.index('pending'))]
+        )
+
+    def test_columnar_matches_markers(self):
+        """Test the columnar API returns the same markers as extract_markers."""
+        content = "Pending review of the tested pattern implementation. Pattern works."
+        markers = self.extractor.extract_markers(content)
+        memory_types, positions, contexts = self.extractor.extract_markers_columnar(content)
+
+        self.assertEqual(memory_types, [m.memory_type for m in markers])
+        self.assertEqual(positions, [m.position for m in markers])
+        self.assertEqual(contexts, [m.context for m in markers])
+
+    def test_marker_has_slots(self):
+        """Test that MemoryMarker instances carry no per-instance __dict__."""
+        marker = MemoryMarker(memory_type='PATTERN', context='ctx', position=0)
+        self.assertFalse(hasattr(marker, '__dict__'))
+
     def test_context_extraction(self):
         """Test context extraction around marker."""
         content = "A" * 100 + " pattern " + "B" * 100
@@ -261,8 +303,9 @@ class TestExtractMarkers(unittest.TestCase):
 class TestHasMemoryType(unittest.TestCase):
     """Test has_memory_type method."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_has_pattern(self):
         """Test checking for PATTERN."""
@@ -294,12 +337,20 @@ class TestHasMemoryType(unittest.TestCase):
         content = "Some content."
         self.assertFalse(self.extractor.has_memory_type(content, 'INVALID'))
 
+    def test_non_ascii_content(self):
+        """Test has_memory_type on content outside ASCII."""
+        content = "Le pattern est vérifié, cafétodo"
+        self.assertTrue(self.extractor.has_memory_type(content, 'PATTERN'))
+        self.assertFalse(self.extractor.has_memory_type(content, 'WAITING'))
+        self.assertFalse(self.extractor.has_memory_type(content, 'INVALID'))
+
 
 class TestMemoryBoost(unittest.TestCase):
     """Test memory boost calculation."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_pattern_boost(self):
         """Test PATTERN boost (5%)."""
@@ -336,12 +387,18 @@ class TestMemoryBoost(unittest.TestCase):
         boost = self.extractor.get_memory_boost(['PATTERN', 'UNKNOWN'])
         self.assertEqual(boost, 0.05)  # Only PATTERN counts
 
+    def test_duplicate_types_count_once(self):
+        """Test repeated memory types do not stack."""
+        boost = self.extractor.get_memory_boost(['PATTERN', 'PATTERN', 'WAITING'])
+        self.assertEqual(boost, self.extractor.get_memory_boost(['PATTERN', 'WAITING']))
+
 
 class TestExtractFromMessages(unittest.TestCase):
     """Test extracting memory types from message lists."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_extract_from_single_message(self):
         """Test extraction from single message."""
@@ -397,12 +454,41 @@ class TestExtractFromMessages(unittest.TestCase):
         types = self.extractor.extract_from_messages(messages)
         self.assertIn('PATTERN', types)
 
+    def test_matches_per_message_extraction(self):
+        """Test the combined scan agrees with extracting each message separately."""
+        messages = [
+            {'content': 'Plain text.'},
+            {'content': 'Café strategy, still pending.'},
+            {'content': 'All tests pass.'},
+            {'content': 'Another pattern after everything was found.'},
+        ]
+        expected = sorted({
+            memory_type
+            for message in messages
+            for memory_type in self.extractor.extract_memory_types(message['content'])
+        })
+        self.assertEqual(self.extractor.extract_from_messages(messages), expected)
+
+    def test_stops_once_all_types_found(self):
+        """Test that messages after every type has been seen are not scanned."""
+        messages = [
+            {'content': 'Pattern tested, still waiting.'},
+            {'content': 'Not scanned.'},
+        ]
+        with patch.object(self.extractor, '_memory_type_mask',
+                          wraps=self.extractor._memory_type_mask) as mask:
+            types = self.extractor.extract_from_messages(messages)
+
+        self.assertEqual(types, ['PATTERN', 'WAITING', 'WORKING_SOLUTION'])
+        self.assertEqual(mask.call_count, 1)
+
 
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and error handling."""
 
-    def setUp(self):
-        self.extractor = MemoryExtractor()
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = MemoryExtractor()
 
     def test_empty_content(self):
         """Test with empty content."""
@@ -442,6 +528,39 @@ class TestEdgeCases(unittest.TestCase):
         # Should not match because 'pattern' in 'patterned' doesn't have word boundaries
         self.assertNotIn('PATTERN', types)
 
+    def test_underscore_is_word_character(self):
+        """Test that keywords joined by underscores are not matched."""
+        types = self.extractor.extract_memory_types("see todo_list and pending_items")
+        self.assertEqual(types, [])
+
+    def test_ascii_fast_path_matches_regexes(self):
+        """Test the ASCII literal scan agrees with the keyword regexes."""
+        samples = [
+            "Design Pattern applied; ALL TESTS PASS.",
+            "patterned, pre-tested, unverified: none of these count",
+            "strategy-based approach (in progress) - resume later",
+            "work is TODO/blocked\nbut the implementation complete",
+            "tested_code isn't tested",
+            "",
+        ]
+        for content in samples:
+            with self.subTest(content=content):
+                expected = sorted(
+                    memory_type
+                    for memory_type, regex in (
+                        ('PATTERN', self.extractor.pattern_regex),
+                        ('WORKING_SOLUTION', self.extractor.working_solution_regex),
+                        ('WAITING', self.extractor.waiting_regex),
+                    )
+                    if regex.search(content)
+                )
+                self.assertEqual(self.extractor.extract_memory_types(content), expected)
+
+    def test_non_ascii_word_boundary(self):
+        """Test that non-ASCII letters still count as word characters."""
+        types = self.extractor.extract_memory_types("\u0130pattern and caf\u00e9todo")
+        self.assertEqual(types, [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ Tests for multi-threaded initial setup.
 Tests the parallel processing capability of InitialSetup with multiple worker threads.
 """
 
+import os
 import pytest
 import tempfile
 import shutil
@@ -27,17 +28,15 @@ def temp_dirs():
     shutil.rmtree(claude_dir, ignore_errors=True)
 
 
-@pytest.fixture
-def sample_sessions(temp_dirs):
-    """Create sample session files for testing."""
-    _, claude_dir = temp_dirs
-    sessions_dir = Path(claude_dir) / "projects" / "test-project" / "sessions"
-    sessions_dir.mkdir(parents=True, exist_ok=True)
+@pytest.fixture(scope="session")
+def sample_session_sources(tmp_path_factory):
+    """Write the sample session files once for the whole test session."""
+    source_dir = tmp_path_factory.mktemp("sample-sessions")
 
     # Create 10 small session files
     session_files = []
     for i in range(10):
-        session_file = sessions_dir / f"test-session-{i:03d}.jsonl"
+        session_file = source_dir / f"test-session-{i:03d}.jsonl"
 
         # Create simple session data
         messages = []
@@ -60,6 +59,23 @@ def sample_sessions(temp_dirs):
     return session_files
 
 
+@pytest.fixture
+def sample_sessions(temp_dirs, sample_session_sources):
+    """Link the shared sample session files into this test's claude directory."""
+    _, claude_dir = temp_dirs
+    sessions_dir = Path(claude_dir) / "projects" / "test-project" / "sessions"
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+
+    # Setup only reads session files, so symlinks to the shared copies suffice
+    session_files = []
+    for source in sample_session_sources:
+        session_file = sessions_dir / source.name
+        os.symlink(source, session_file)
+        session_files.append(session_file)
+
+    return session_files
+
+
 def test_single_threaded_indexing(temp_dirs, sample_sessions):
     """Test that single-threaded indexing works (workers=1)."""
     storage_dir, claude_dir = temp_dirs
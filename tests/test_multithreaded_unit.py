@@ -4,8 +4,12 @@ Unit tests for multi-threaded initial setup (without full model loading).
 Tests the multi-threading logic without the overhead of loading embedding models.
 """
 
+import threading
+import time
+from unittest.mock import MagicMock
+
 import pytest
-from src.smart_fork.initial_setup import InitialSetup
+from src.smart_fork.initial_setup import InitialSetup, _EmbeddingBatcher
 
 
 def test_workers_parameter_initialization():
@@ -28,14 +32,12 @@ def test_workers_parameter_initialization():
 
 
 def test_locks_initialized():
-    """Test that thread safety locks are initialized."""
+    """Test that the progress lock is initialized."""
     setup = InitialSetup(workers=4, show_progress=False)
 
-    # Check that locks exist
+    # State is only updated on the consuming thread, so only progress is locked
     assert hasattr(setup, '_progress_lock')
-    assert hasattr(setup, '_state_lock')
     assert setup._progress_lock is not None
-    assert setup._state_lock is not None
 
 
 def test_process_files_sequential_exists():
@@ -52,5 +54,134 @@ def test_process_files_parallel_exists():
     assert callable(getattr(setup, '_process_files_parallel'))
 
 
+def test_embedding_batcher_returns_each_callers_slice():
+    """Test that concurrent callers get their own embeddings back in order."""
+    service = MagicMock()
+    service.embed_texts.side_effect = lambda texts: [[float(len(t))] for t in texts]
+
+    batcher = _EmbeddingBatcher(service)
+    inputs = [["a", "bb"], ["ccc"], ["dddd", "eeeee", "ffffff"]]
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.embed_texts(inputs[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    for i, texts in enumerate(inputs):
+        assert results[i] == [[float(len(t))] for t in texts]
+    total_texts = sum(len(call.args[0]) for call in service.embed_texts.call_args_list)
+    assert total_texts == 6
+
+
+def test_embedding_batcher_propagates_errors():
+    """Test that an encode failure is raised in the waiting worker."""
+    service = MagicMock()
+    service.embed_texts.side_effect = RuntimeError("encode failed")
+
+    batcher = _EmbeddingBatcher(service)
+    with pytest.raises(RuntimeError, match="encode failed"):
+        batcher.embed_texts(["text"])
+    batcher.close()
+
+
+def test_embedding_batcher_rejects_requests_after_close():
+    """Test that a request queued after the feeder stopped fails instead of hanging."""
+    batcher = _EmbeddingBatcher(MagicMock())
+    batcher.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.embed_texts(["text"])
+
+
+def test_embedding_batcher_fails_pending_when_feeder_dies():
+    """Test that waiting workers are released if the feeder thread dies."""
+    service = MagicMock()
+    service.embed_texts.side_effect = KeyboardInterrupt()
+
+    batcher = _EmbeddingBatcher(service)
+    with pytest.raises(KeyboardInterrupt):
+        batcher.embed_texts(["text"])
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.embed_texts(["more text"])
+    batcher.close()
+
+
+def _batched_setup(tmp_path, embed):
+    """Create an InitialSetup whose parallel batcher embeds with embed()."""
+    setup = InitialSetup(workers=2, show_progress=False, timeout_per_session=0.5)
+    setup.session_parser = MagicMock()
+    setup.chunking_service = MagicMock()
+    setup.chunking_service.chunk_messages.return_value = [
+        MagicMock(content="chunk", start_index=0, end_index=1, memory_types=[])
+    ]
+    setup.vector_db_service = MagicMock()
+    setup.session_registry = MagicMock()
+
+    service = MagicMock()
+    service.embed_texts.side_effect = embed
+    setup._embedding_batcher = _EmbeddingBatcher(service)
+
+    session_file = tmp_path / "small.jsonl"
+    session_file.write_text('{"role": "user", "content": "test"}\n')
+    return setup, session_file
+
+
+def test_queued_batch_wait_does_not_count_against_file_timeout(tmp_path):
+    """Test that waiting behind another worker's slow batch does not time out a file."""
+    other_encoding = threading.Event()
+
+    def embed(texts):
+        if texts == ["other"]:
+            other_encoding.set()
+            time.sleep(1.0)
+        return [[0.1] for _ in texts]
+
+    setup, session_file = _batched_setup(tmp_path, embed)
+    other = threading.Thread(target=setup._embedding_batcher.embed_texts, args=(["other"],))
+    other.start()
+    other_encoding.wait()
+    try:
+        result = setup._process_session_file_with_timeout(session_file)
+    finally:
+        other.join()
+        setup._embedding_batcher.close()
+
+    assert result['success'] is True
+    assert result.get('timed_out', False) is False
+
+
+def test_own_batch_encode_counts_against_file_timeout(tmp_path):
+    """Test that a slow encode of the file's own batch still times it out."""
+    def embed(texts):
+        time.sleep(1.0)
+        return [[0.1] for _ in texts]
+
+    setup, session_file = _batched_setup(tmp_path, embed)
+    try:
+        result = setup._process_session_file_with_timeout(session_file)
+    finally:
+        setup._embedding_batcher.close()
+
+    assert result['success'] is False
+    assert result['timed_out'] is True
+
+
+def test_process_files_parallel_clears_batcher():
+    """Test that the batcher only exists while parallel processing runs."""
+    setup = InitialSetup(workers=2, show_progress=False)
+    setup.embedding_service = MagicMock()
+    setup._process_files_in_pool = MagicMock(return_value={'interrupted': False})
+
+    setup._process_files_parallel([], [], MagicMock(), 0.0)
+
+    assert setup._embedding_batcher is None
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
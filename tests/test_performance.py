@@ -27,9 +27,12 @@ from smart_fork.chunking_service import ChunkingService
 from smart_fork.embedding_service import EmbeddingService
 from smart_fork.vector_db_service import VectorDBService
 from smart_fork.scoring_service import ScoringService
-from smart_fork.session_registry import SessionRegistry
+from smart_fork.session_registry import SessionMetadata, SessionRegistry
 from smart_fork.search_service import SearchService
 
+# SessionParser keeps no per-file state beyond its stats, so one instance serves every test
+_PARSER = SessionParser()
+
 
 class PerformanceMonitor:
     """Monitor system performance metrics during tests."""
@@ -44,7 +47,7 @@ class PerformanceMonitor:
         """Start monitoring."""
         self.start_memory = self.process.memory_info().rss / (1024 * 1024)  # MB
         self.peak_memory = self.start_memory
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
 
     def check(self):
         """Check current memory usage."""
@@ -54,7 +57,7 @@ class PerformanceMonitor:
 
     def report(self):
         """Get performance report."""
-        elapsed = time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
         current_memory = self.check()
         return {
             'elapsed_seconds': elapsed,
@@ -65,34 +68,38 @@ class PerformanceMonitor:
         }
 
 
+# Message content per role; %(i)d is filled in with the message index
+_USER_CONTENT = (
+    "Test query %(i)d: Can you help me implement feature %(i)d? "
+    "I need to create a function that handles " + ' '.join(['data'] * 10) + "."
+)
+_ASSISTANT_CONTENT = (
+    "Test response %(i)d: Here's the implementation for feature %(i)d.\n\n"
+    "```python\ndef feature_%(i)d():\n    # Implementation here\n"
+    "    data = {'key': 'value', 'index': %(i)d}\n    result = process_data(data)\n"
+    "    return result\n```\n\nThis implementation follows the pattern we discussed earlier."
+)
+
+# Complete JSONL lines with the content JSON-escaped once, so generating a
+# message is a single %-format instead of building a dict and json.dumps
+_LINE_TEMPLATES = tuple(
+    '{"role": "' + role + '", "content": ' + json.dumps(content) +
+    ', "timestamp": "%(ts)s", "model": "claude-sonnet-4.5", "id": "msg_%(i)d"}\n'
+    for role, content in (("user", _USER_CONTENT), ("assistant", _ASSISTANT_CONTENT))
+)
+
+
 def generate_large_session_file(file_path: str, num_messages: int, project: str = "test-project"):
     """Generate a large session file with specified number of messages."""
-    messages = []
-
     base_time = datetime.now()
-    for i in range(num_messages):
-        # Alternate between user and assistant
-        role = "user" if i % 2 == 0 else "assistant"
-
-        # Generate varied content
-        if role == "user":
-            content = f"Test query {i}: Can you help me implement feature {i}? I need to create a function that handles {' '.join(['data'] * 10)}."
-        else:
-            content = f"Test response {i}: Here's the implementation for feature {i}.\n\n```python\ndef feature_{i}():\n    # Implementation here\n    data = {{'key': 'value', 'index': {i}}}\n    result = process_data(data)\n    return result\n```\n\nThis implementation follows the pattern we discussed earlier."
-
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": (base_time + timedelta(seconds=i)).isoformat(),
-            "model": "claude-sonnet-4.5",
-            "id": f"msg_{i}"
-        }
-        messages.append(message)
 
-    # Write JSONL file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        for msg in messages:
-            f.write(json.dumps(msg) + '\n')
+    # Alternate between user and assistant; write through a 1 MiB buffer
+    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for i in range(num_messages):
+            f.write(_LINE_TEMPLATES[i % 2] % {
+                'i': i,
+                'ts': (base_time + timedelta(seconds=i)).isoformat()
+            })
 
 
 @pytest.fixture
@@ -104,13 +111,21 @@ def temp_storage():
     shutil.rmtree(temp_dir, ignore_errors=True)
 
 
+@pytest.fixture(scope="module")
+def shared_embedding_service():
+    """Load the embedding model once for every test in this module."""
+    embedding_service = EmbeddingService()
+    yield embedding_service
+    embedding_service.unload_model()
+
+
 @pytest.fixture
-def services(temp_storage):
+def services(temp_storage, shared_embedding_service):
     """Initialize all services with temporary storage."""
     storage_path = Path(temp_storage)
 
-    # Initialize services
-    embedding_service = EmbeddingService()
+    # Initialize services; only the embedding model is shared between tests
+    embedding_service = shared_embedding_service
     vector_db = VectorDBService(str(storage_path / "vector_db"))
     scoring_service = ScoringService()
     session_registry = SessionRegistry(str(storage_path / "registry.json"))
@@ -146,8 +161,8 @@ class TestPerformanceIndexing:
         generate_large_session_file(str(session_file), 1000)
 
         # Parse session
-        parser = SessionParser()
-        session_data = parser.parse_file(str(session_file))
+        session_data = _PARSER.parse_file(str(session_file))
+        now_iso = datetime.now().isoformat()
 
         assert len(session_data.messages) == 1000, "Should parse all 1000 messages"
 
@@ -169,24 +184,23 @@ class TestPerformanceIndexing:
 
             # Add to vector DB
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(i, i + len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso},
+                chunk_ids=[f"{session_id}_chunk_{j}" for j in range(i, i + len(texts))]
             )
 
             # Check memory periodically
             current_memory = monitor.check()
 
         # Add to registry
-        services['registry'].add_session(
+        services['registry'].add_session(session_id, SessionMetadata(
             session_id=session_id,
             project="test-project",
-            created_at=datetime.now().isoformat(),
+            created_at=now_iso,
             chunk_count=len(chunks),
             message_count=1000
-        )
+        ))
 
         report = monitor.report()
 
@@ -217,8 +231,8 @@ class TestPerformanceIndexing:
             generate_large_session_file(str(session_file), messages_per_session, f"project_{session_idx % 2}")
 
             # Parse and index
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
 
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
@@ -229,20 +243,18 @@ class TestPerformanceIndexing:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project=f"project_{session_idx % 2}",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=messages_per_session
-            )
+            ))
 
             monitor.check()
 
@@ -279,51 +291,71 @@ class TestPerformanceSearch:
         monitor = PerformanceMonitor()
         monitor.start()
 
-        # Generate enough sessions to create ~10,000 chunks
-        # Estimate: 400 messages = ~50-80 chunks, so ~130 sessions needed
         target_chunks = 10000
         messages_per_session = 400
-        estimated_chunks_per_session = 60
-        num_sessions = target_chunks // estimated_chunks_per_session + 5
 
-        print(f"\nGenerating {num_sessions} sessions to create ~{target_chunks} chunks...")
+        # Generated sessions differ only in message timestamps, so their chunks
+        # are identical: chunk and embed one session, then index it per session ID
+        session_file = Path(temp_storage) / "search_session_template.jsonl"
+        generate_large_session_file(str(session_file), messages_per_session)
 
-        total_chunks = 0
-        for session_idx in range(num_sessions):
-            session_file = Path(temp_storage) / f"search_session_{session_idx}.jsonl"
-            generate_large_session_file(str(session_file), messages_per_session)
+        session_data = _PARSER.parse_file(str(session_file))
+        chunks = services['chunking'].chunk_messages(session_data.messages)
+        texts = [chunk.content for chunk in chunks]
+        embeddings = services['embedding'].embed_texts(texts)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
-            chunks = services['chunking'].chunk_messages(session_data.messages)
+        # Enough copies of the template session to reach ~10,000 chunks
+        num_sessions = -(-target_chunks // len(chunks))
 
-            session_id = f"search_session_{session_idx}"
-            texts = [chunk.content for chunk in chunks]
-            embeddings = services['embedding'].embed_texts(texts)
+        print(f"\nIndexing {num_sessions} sessions to create ~{target_chunks} chunks...")
+
+        # Index in waves spanning several sessions so each add_chunks call
+        # writes a full batch instead of one session's chunks
+        wave_size = 512
+        wave = []  # (session_id, created_at) pairs not yet indexed
 
+        def index_wave():
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{
-                    'created_at': (datetime.now() - timedelta(days=session_idx)).isoformat()
-                }] * len(texts)
+                texts * len(wave),
+                embeddings * len(wave),
+                [
+                    {'session_id': session_id, 'created_at': created_at}
+                    for session_id, created_at in wave
+                    for _ in texts
+                ],
+                chunk_ids=[
+                    f"{session_id}_chunk_{j}"
+                    for session_id, _ in wave
+                    for j in range(len(texts))
+                ]
             )
+            wave.clear()
+
+        total_chunks = 0
+        for session_idx in range(num_sessions):
+            session_id = f"search_session_{session_idx}"
+            created_at = (datetime.now() - timedelta(days=session_idx)).isoformat()
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project=f"project_{session_idx % 3}",
-                created_at=(datetime.now() - timedelta(days=session_idx)).isoformat(),
+                created_at=created_at,
                 chunk_count=len(chunks),
                 message_count=messages_per_session
-            )
+            ))
 
+            wave.append((session_id, created_at))
             total_chunks += len(chunks)
 
+            if len(wave) * len(texts) >= wave_size or total_chunks >= target_chunks:
+                index_wave()
+
             if total_chunks >= target_chunks:
                 break
 
+        if wave:
+            index_wave()
+
         setup_report = monitor.report()
         print(f"Setup complete: {total_chunks} chunks indexed in {setup_report['elapsed_seconds']:.2f}s")
 
@@ -343,9 +375,9 @@ class TestPerformanceSearch:
         search_times = []
 
         for query in test_queries:
-            start_time = time.time()
-            results = services['search'].search(query, top_n_sessions=5)
-            search_time = time.time() - start_time
+            start_time = time.perf_counter()
+            results = services['search'].search(query, top_n=5)
+            search_time = time.perf_counter() - start_time
             search_times.append(search_time)
 
             assert len(results) > 0, "Should return results"
@@ -380,8 +412,8 @@ class TestPerformanceSearch:
             session_file = Path(temp_storage) / f"latency_session_{session_idx}.jsonl"
             generate_large_session_file(str(session_file), messages_per_session)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
             session_id = f"latency_session_{session_idx}"
@@ -389,28 +421,26 @@ class TestPerformanceSearch:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project="latency-test",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=messages_per_session
-            )
+            ))
 
         # Run 100 search queries
         search_times = []
         for i in range(100):
             query = f"implement feature {i % 10} with data processing"
-            start_time = time.time()
-            results = services['search'].search(query, top_n_sessions=5)
-            search_time = time.time() - start_time
+            start_time = time.perf_counter()
+            results = services['search'].search(query, top_n=5)
+            search_time = time.perf_counter() - start_time
             search_times.append(search_time)
 
         # Calculate statistics
@@ -441,8 +471,8 @@ class TestPerformanceConcurrent:
             session_file = Path(temp_storage) / f"initial_session_{i}.jsonl"
             generate_large_session_file(str(session_file), 100)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
             session_id = f"initial_session_{i}"
@@ -450,28 +480,26 @@ class TestPerformanceConcurrent:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project="concurrent-test",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=100
-            )
+            ))
 
         # Define indexing task
         def index_session(session_idx):
             session_file = Path(temp_storage) / f"concurrent_session_{session_idx}.jsonl"
             generate_large_session_file(str(session_file), 50)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
             session_id = f"concurrent_session_{session_idx}"
@@ -479,27 +507,25 @@ class TestPerformanceConcurrent:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project="concurrent-test",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=50
-            )
+            ))
 
             return len(chunks)
 
         # Define search task
         def search_query(query_idx):
             query = f"implement feature {query_idx}"
-            results = services['search'].search(query, top_n_sessions=3)
+            results = services['search'].search(query, top_n=3)
             return len(results)
 
         # Run concurrent operations
@@ -562,8 +588,8 @@ class TestPerformanceMemory:
             session_file = Path(temp_storage) / f"memory_session_{session_idx}.jsonl"
             generate_large_session_file(str(session_file), messages_per_session)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
             session_id = f"memory_session_{session_idx}"
@@ -571,20 +597,18 @@ class TestPerformanceMemory:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project="memory-test",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=messages_per_session
-            )
+            ))
 
             # Sample memory every few sessions
             current_memory = monitor.check()
@@ -593,7 +617,7 @@ class TestPerformanceMemory:
         # Perform searches to test memory under mixed load
         for i in range(20):
             query = f"implement feature {i} with data processing"
-            services['search'].search(query, top_n_sessions=5)
+            services['search'].search(query, top_n=5)
             memory_samples.append(monitor.check())
 
         report = monitor.report()
@@ -623,8 +647,8 @@ class TestPerformanceDatabaseSize:
             session_file = Path(temp_storage) / f"size_session_{session_idx}.jsonl"
             generate_large_session_file(str(session_file), messages_per_session)
 
-            parser = SessionParser()
-            session_data = parser.parse_file(str(session_file))
+            session_data = _PARSER.parse_file(str(session_file))
+            now_iso = datetime.now().isoformat()
             chunks = services['chunking'].chunk_messages(session_data.messages)
 
             session_id = f"size_session_{session_idx}"
@@ -632,29 +656,33 @@ class TestPerformanceDatabaseSize:
             embeddings = services['embedding'].embed_texts(texts)
 
             services['vector_db'].add_chunks(
-                embeddings=embeddings,
-                texts=texts,
-                session_ids=[session_id] * len(texts),
-                chunk_indices=list(range(len(texts))),
-                metadatas=[{'created_at': datetime.now().isoformat()}] * len(texts)
+                texts,
+                embeddings,
+                {'session_id': session_id, 'created_at': now_iso}
             )
 
-            services['registry'].add_session(
+            services['registry'].add_session(session_id, SessionMetadata(
                 session_id=session_id,
                 project="size-test",
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso,
                 chunk_count=len(chunks),
                 message_count=messages_per_session
-            )
+            ))
 
         # Calculate database size
         storage_path = services['storage_path']
         total_size_bytes = 0
 
-        for root, dirs, files in os.walk(storage_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                total_size_bytes += os.path.getsize(file_path)
+        # Reuse the file type from each directory listing instead of a
+        # separate getsize() lookup per file
+        pending_dirs = [str(storage_path)]
+        while pending_dirs:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_dirs.append(entry.path)
+                    elif entry.is_file():
+                        total_size_bytes += entry.stat().st_size
 
         total_size_kb = total_size_bytes / 1024
         total_size_mb = total_size_kb / 1024
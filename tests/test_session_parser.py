@@ -14,6 +14,7 @@ import json
 import pytest
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
 from smart_fork.session_parser import SessionParser, SessionMessage, SessionData
 
 
@@ -178,6 +179,27 @@ class TestSessionParser:
         assert session.parse_errors == 1
         assert parser.stats['skipped_lines'] == 1
 
+    @pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "stdlib"])
+    def test_parse_json_backends(self, parser, temp_session_file, use_orjson):
+        """Test that orjson and the stdlib fallback parse and skip lines alike."""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        content = '\n'.join([
+            json.dumps({"role": "user", "content": "Caf\u00e9 message"}),
+            '{invalid json here',
+            json.dumps({"role": "assistant", "content": "Another valid message"}),
+        ])
+        file_path = temp_session_file(content)
+
+        if use_orjson:
+            session = parser.parse_file(file_path)
+        else:
+            with patch("smart_fork.session_parser.orjson", None):
+                session = parser.parse_file(file_path)
+
+        assert [m.content for m in session.messages] == ["Caf\u00e9 message", "Another valid message"]
+        assert session.parse_errors == 1
+
     def test_parse_malformed_json_strict(self, strict_parser, temp_session_file):
         """Test parsing with malformed JSON in strict mode."""
         content = '\n'.join([
@@ -184,6 +184,22 @@ class TestAddChunks:
         assert result.metadata["float_field"] == 3.14
         assert result.metadata["bool_field"] is True
 
+    def test_add_chunks_with_shared_metadata(self, db_service, sample_embeddings):
+        """Test that a single metadata dict is applied to every chunk."""
+        chunks = [f"Chunk {i}" for i in range(3)]
+        metadata = {"session_id": "session_1", "memory_types": ["PATTERN"]}
+
+        chunk_ids = db_service.add_chunks(chunks, sample_embeddings[:3], metadata)
+
+        assert chunk_ids == [f"session_1_chunk_{i}" for i in range(3)]
+        for chunk_id in chunk_ids:
+            result = db_service.get_chunk_by_id(chunk_id)
+            assert result.metadata["session_id"] == "session_1"
+            assert result.metadata["memory_types"] == ["PATTERN"]
+
+        # The caller's dict is not converted in place
+        assert metadata["memory_types"] == ["PATTERN"]
+
 
 class TestSearchChunks:
     """Test search_chunks method."""